@@ -2,35 +2,53 @@ import flet as ft
 import json
 from datetime import datetime
 import os
-import requests
 import base64
 import asyncio
-import pandas as pd
-import re
-
-# הגדרת מחלקות בסיסיות
-class Contact:
-    def __init__(self, name, phone, email="", group=""):
-        self.name = name
-        self.phone = phone
-        self.email = email
-        self.group = group
-
-class Event:
-    def __init__(self, title, date, time, location, participants=None):
-        self.title = title
-        self.date = date
-        self.time = time
-        self.location = location
-        self.participants = participants or []
-        self.pending_participants = [] 
-        self.pending_notes = {}
-        
-class Group:
-    def __init__(self, name, description=""):
-        self.name = name
-        self.description = description
-        self.members = []
+import atexit
+import threading
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+
+from save_queue import SaveQueue
+from github_sync import GitHubSyncWorker
+from http_client import GitHubSession, GITHUB_API_URL
+from search_index import SearchIndex
+from debounce import Debouncer
+from card_cache import CardCache
+from render_batch import PageUpdater, batched_render
+from membership_index import MembershipIndex
+from sharded_storage import (
+    ShardedStorage,
+    join_data,
+    record_shards,
+    contact_shard_path,
+    serialize,
+    MANIFEST_FILE,
+    LEGACY_FILE,
+    ORDER_FILE,
+    EVENTS_FILE,
+    GROUPS_FILE,
+    LOAD_WORKERS
+)
+from journal import ChangeJournal, replay
+from sqlite_store import SQLiteStore, SQLITE_FILE
+from models import Contact, Event, Group, MemberSet, STATUS_CONFIRMED, normalize_phone
+from excel_import import (
+    iter_contact_chunks,
+    detect_phone_column,
+    prepare_contacts_frame,
+    PHONE_SAMPLE_ROWS
+)
+
+# גרסת מבנה קובץ הנתונים: 1 - הפניות לפי שם, 2 - הפניות לפי מזהה
+SCHEMA_VERSION = 2
+
+# התצוגות ש-update_views יודע לרענן
+VIEW_CONTACTS = "contacts"
+VIEW_EVENTS = "events"
+VIEW_GROUPS = "groups"
+VIEW_GROUP_OPTIONS = "group_options"
+ALL_VIEWS = (VIEW_CONTACTS, VIEW_EVENTS, VIEW_GROUPS, VIEW_GROUP_OPTIONS)
 
 class LoginManager:
     def __init__(self):
@@ -42,9 +60,30 @@ class LoginManager:
         self.password_field = None
         self.error_text = None
         self.on_login_success = None
+        # מאחד את עדכוני הדף לעדכון אחד לכל פעולת משתמש
+        self.page_updater = PageUpdater()
+        # נקרא כשמגיעים מגיטהאב נתונים חדשים מאלה שנטענו מקומית
+        self.on_remote_data = None
+
+        # סנכרון מול גיטהאב מתבצע ברקע כדי לא לחסום את הממשק
+        self.sync_worker = GitHubSyncWorker()
+        # חיבור HTTP אחד משותף לכל הפניות לגיטהאב
+        self.http = GitHubSession(self.github_token)
+        # הנתונים נשמרים מקומית בקבצים נפרדים; נוצר אחרי ההתחברות
+        self.storage = None
+        # ה-SHA של כל קובץ בגיטהאב מהטעינה או השמירה האחרונה
+        self.remote_shas = {}
+        # ה-ETag של קובץ המפתח בגיטהאב שהעותק המקומי משקף
+        self.remote_etag = None
+        # קבצים שנשמרו מקומית ועוד לא עלו לגיטהאב
+        self._pending_push = {}
+        self._push_lock = threading.Lock()
+        # הגדרות הארגון מ-organizations.json (למשל "storage": "sqlite")
+        self.organization_settings = {}
 
     def create_login_page(self, page, on_login_success):
         self.page = page
+        self.page_updater.page = page
         self.on_login_success = on_login_success
         
         # הגדרות בסיסיות של החלון
@@ -67,7 +106,7 @@ class LoginManager:
                 alignment=ft.alignment.center
             )
         )
-        page.update()
+        self.page_updater.request_update()
 
     def create_form_fields(self):
         self.organization_field = ft.TextField(
@@ -144,12 +183,13 @@ class LoginManager:
 
     def try_login(self, e):
         print("בודק התחברות")
-        if self.validate_organization(self.organization_field.value, self.password_field.value):
-            self.current_user = self.organization_field.value
-            self.on_login_success()
-        else:
-            self.error_text.value = "שם ארגון או סיסמה שגויים"
-            self.page.update()
+        with self.page_updater.batch():
+            if self.validate_organization(self.organization_field.value, self.password_field.value):
+                self.current_user = self.organization_field.value
+                self.on_login_success()
+            else:
+                self.error_text.value = "שם ארגון או סיסמה שגויים"
+                self.page_updater.request_update()
 
     def validate_organization(self, org_name, password):
         try:
@@ -163,7 +203,12 @@ class LoginManager:
             with open(org_file_path, 'r', encoding='utf-8') as f:
                 orgs_data = json.load(f)
             
-            return org_name in orgs_data and orgs_data[org_name]["password"] == password
+            if org_name in orgs_data and orgs_data[org_name]["password"] == password:
+                self.organization_settings = {
+                    key: value for key, value in orgs_data[org_name].items() if key != "password"
+                }
+                return True
+            return False
             
         except Exception as e:
             print(f"שגיאה באימות: {str(e)}")
@@ -172,100 +217,303 @@ class LoginManager:
     def load_organization_data(self):
         if not self.current_user:
             return None
-        
-        try:
-            # ניסיון לטעון מגיטהאב
-            headers = {
-                "Authorization": f"Bearer {self.github_token}",
-                "Accept": "application/vnd.github.v3+json"
-            }
-            
-            file_path = f"DATA/{self.current_user}/data.json"
-            url = f"https://api.github.com/repos/DARTYQO/people/contents/{file_path}"
-            
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                content = base64.b64decode(response.json()["content"]).decode('utf-8')
-                data = json.loads(content)
-                self.show_message("הנתונים נטענו בהצלחה מגיטהאב", ft.colors.GREEN)
-                return data
-                
-        except Exception as e:
-            print(f"שגיאה בטעינה מגיטהאב: {str(e)}")
-        
-        # אם הטעינה מגיטהאב נכשלה, ננסה לטעון מקומית
+
+        self.storage = ShardedStorage(self._org_folder())
+
+        # קודם טעינה מקומית, כדי שהממשק יעלה מיד
+        data = self._load_local_data()
+        if data is not None:
+            meta = self._load_sync_meta()
+            self.remote_shas = meta.get("shas", {})
+            self.remote_etag = meta.get("etag")
+            self.show_message("הנתונים נטענו מהמחשב המקומי", ft.colors.BLUE)
+            # רענון מגיטהאב ברקע - בקשה מותנית, כך שאם לא השתנה כלום חוזר 304 בלבד
+            self.sync_worker.submit(self._refresh_from_github)
+            return data
+
+        # אין עותק מקומי - אין ברירה אלא לחכות לגיטהאב
+        data, etag, shas = self._fetch_from_github()
+        if data is not None:
+            self._store_local_copy(data, etag, shas)
+            self.show_message("הנתונים נטענו בהצלחה מגיטהאב", ft.colors.GREEN)
+        return data
+
+    def resume_organization_data(self):
+        """
+        כשהנתונים נטענים מאחסון אחר (SQLite): מכין את השמירה והסנכרון
+        מול גיטהאב בלי לקרוא ולפענח את קבצי ה-JSON
+        """
+        if not self.current_user:
+            return
+        self.storage = ShardedStorage(self._org_folder())
+        self.storage.load_digests()
+        meta = self._load_sync_meta()
+        self.remote_shas = meta.get("shas", {})
+        self.remote_etag = meta.get("etag")
+        self.sync_worker.submit(self._refresh_from_github)
+
+    def _org_folder(self):
+        return os.path.join(self.data_folder, self.current_user)
+
+    def _load_local_data(self):
         try:
-            local_path = os.path.join(self.data_folder, self.current_user, "data.json")
-            if os.path.exists(local_path):
-                with open(local_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.show_message("הנתונים נטענו מהמחשב המקומי", ft.colors.BLUE)
-                return data
+            return self.storage.load()
         except Exception as e:
             print(f"שגיאה בטעינה מקומית: {str(e)}")
-        
         return None
 
+    def _load_sync_meta(self):
+        """ה-ETag של קובץ המפתח וה-SHA של כל קובץ בגיטהאב שהעותק המקומי משקף"""
+        try:
+            with open(os.path.join(self._org_folder(), "sync_meta.json"), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_sync_meta(self):
+        try:
+            os.makedirs(self._org_folder(), exist_ok=True)
+            with open(os.path.join(self._org_folder(), "sync_meta.json"), 'w', encoding='utf-8') as f:
+                json.dump({"etag": self.remote_etag, "shas": self.remote_shas}, f)
+        except OSError as e:
+            print(f"שגיאה בשמירת נתוני הסנכרון: {str(e)}")
+
+    def _store_local_copy(self, data, etag, shas):
+        """שומר מקומית את הנתונים שהורדו מגיטהאב יחד עם ה-ETag וה-SHA שלהם"""
+        try:
+            # קובץ במבנה הישן (בלי מזהים) לא נכתב כמו שהוא: האפליקציה ממירה אותו
+            # ב-apply_data ושומרת את תמונת המצב המומרת
+            if data.get("schema_version", 1) >= SCHEMA_VERSION:
+                self.storage.save(data)
+            self.remote_shas.update(shas)
+            self.remote_etag = etag
+            self._save_sync_meta()
+        except Exception as e:
+            print(f"שגיאה בשמירה מקומית: {str(e)}")
+
+    def _get_remote_file(self, relative_path, etag=None):
+        """מחזיר (סטטוס, תוכן, SHA, ETag) של קובץ בתיקיית הארגון בגיטהאב"""
+        headers = {"If-None-Match": etag} if etag else {}
+        response = self.http.get(
+            self._contents_url(f"DATA/{self.current_user}/{relative_path}"),
+            headers=headers
+        )
+        if response.status_code != 200:
+            return response.status_code, None, None, None
+        response_data = response.json()
+        content = base64.b64decode(response_data["content"]).decode('utf-8')
+        return 200, content, response_data["sha"], response.headers.get("ETag")
+
+    def _fetch_from_github(self, conditional=False):
+        """
+        מחזיר (נתונים, ETag, {נתיב: SHA}). קודם נבדק קובץ המפתח; מורדים רק
+        הקבצים שהתוכן שלהם שונה מהעותק המקומי. כשהבקשה מותנית ובגיטהאב אין
+        שינוי מוחזר (None, None, {}) בלי להוריד שום קובץ נוסף.
+        ה-SHA וה-ETag לא נשמרים כאן - רק כשהנתונים נשמרים מקומית (_store_local_copy).
+        """
+        try:
+            etag = self.remote_etag if conditional else None
+            status, manifest_text, sha, etag = self._get_remote_file(MANIFEST_FILE, etag)
+
+            if status == 304:
+                return None, None, {}
+            if status == 404:
+                # הארגון עדיין שמור בקובץ אחד - המבנה החדש ייכתב בשמירה הבאה
+                return self._fetch_legacy_from_github(conditional)
+            if status != 200:
+                return None, None, {}
+
+            if conditional and sha == self.remote_shas.get(MANIFEST_FILE):
+                # קובץ המפתח בגיטהאב הוא מה שכבר שמרנו בעצמנו
+                self.remote_etag = etag
+                self._save_sync_meta()
+                return None, None, {}
+
+            manifest, changed = self.storage.remote_manifest(manifest_text)
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+                fetched = list(executor.map(self._get_remote_file, changed))
+
+            shards = {}
+            shas = {MANIFEST_FILE: sha}
+            for path, (shard_status, text, shard_sha, _) in zip(changed, fetched):
+                if shard_status != 200:
+                    raise RuntimeError(f"{path}: {shard_status}")
+                shards[path] = text
+                shas[path] = shard_sha
+            # שאר הקבצים זהים לעותק המקומי
+            for path in manifest["shards"]:
+                if path not in shards:
+                    shards[path] = self.storage.read(path)
+            return join_data(manifest, shards), etag, shas
+
+        except Exception as e:
+            print(f"שגיאה בטעינה מגיטהאב: {str(e)}")
+        return None, None, {}
+
+    def _fetch_legacy_from_github(self, conditional):
+        status, content, sha, _ = self._get_remote_file(LEGACY_FILE)
+        if status != 200 or (conditional and sha == self.remote_shas.get(LEGACY_FILE)):
+            return None, None, {}
+        return json.loads(content), None, {LEGACY_FILE: sha}
+
+    def _refresh_from_github(self):
+        """רץ בתהליכון הסנכרון: בודק אם בגיטהאב יש נתונים שונים מהעותק המקומי"""
+        data, etag, shas = self._fetch_from_github(conditional=True)
+        if data is None:
+            return
+        # העותק המקומי, ה-SHA וה-ETag מתעדכנים רק אם הנתונים החדשים הוחלו בפועל.
+        # אחרת נשארים ה-SHA הישנים, והשמירה הבאה לגיטהאב תזהה את ההתנגשות
+        if self.on_remote_data and self.on_remote_data(data):
+            self._store_local_copy(data, etag, shas)
+            self.show_message("התקבלו נתונים מעודכנים מגיטהאב", ft.colors.GREEN)
+        else:
+            self.show_message(
+                "הנתונים בגיטהאב שונו ממכשיר אחר בזמן שערכת כאן - השמירה הבאה תדרוס אותם",
+                ft.colors.ORANGE
+            )
+
     def save_organization_data(self, data):
         if not self.current_user:
             return False
         
         try:
-            # שמירה מקומית
-            org_folder = os.path.join(self.data_folder, self.current_user)
-            if not os.path.exists(org_folder):
-                os.makedirs(org_folder)
-            
-            local_path = os.path.join(org_folder, "data.json")
-            json_data = json.dumps(data, ensure_ascii=False, indent=4)
-            
-            with open(local_path, 'w', encoding='utf-8') as f:
-                f.write(json_data)
-            
-            # שמירה לגיטהאב
-            self._save_to_github(json_data)
+            # שמירה מקומית - נכתבים רק הקבצים שהשתנו
+            self._queue_push(self.storage.save(data))
             return True
             
         except Exception as e:
             print(f"שגיאה בשמירת הנתונים: {str(e)}")
             return False
 
-    def _save_to_github(self, json_data):
-        headers = {
-            "Authorization": f"Bearer {self.github_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
-        
-        file_path = f"DATA/{self.current_user}/data.json"
-        url = f"https://api.github.com/repos/DARTYQO/people/contents/{file_path}"
+    def save_organization_shards(self, shards, schema_version):
+        """שמירה של קבצים מפוצלים מסוימים בלבד, כשידוע מראש מה השתנה"""
+        if not self.current_user:
+            return False
+
+        try:
+            self._queue_push(self.storage.save_shards(shards, schema_version))
+            return True
+
+        except Exception as e:
+            print(f"שגיאה בשמירת הנתונים: {str(e)}")
+            return False
+
+    def _queue_push(self, changed):
+        if changed:
+            if MANIFEST_FILE in changed and LEGACY_FILE in self.remote_shas:
+                # data.json הישן בגיטהאב כבר לא מתעדכן - נמחק אחרי שקובץ המפתח עולה
+                changed[LEGACY_FILE] = None
+            # שמירה לגיטהאב ברקע. הקבצים מצטברים, כך שגם אם משימה
+            # נזרקה מתור מלא, המשימה הבאה תעלה גם אותם
+            with self._push_lock:
+                self._pending_push.update(changed)
+            self.sync_worker.submit(self._push_pending)
+
+    def _contents_url(self, file_path):
+        return f"{GITHUB_API_URL}/repos/DARTYQO/people/contents/{file_path}"
+
+    def _push_pending(self):
+        with self._push_lock:
+            pending, self._pending_push = self._pending_push, {}
+        if not pending:
+            return
+
+        failed = {}
+        conflicts = []
+        # קובץ המפתח עולה אחרי כל הקבצים שהוא מפנה אליהם, ורק אם כולם עלו.
+        # קבצים למחיקה (הערך None - data.json הישן) נמחקים רק אחרי קובץ המפתח
+        for path in sorted(pending, key=lambda p: (pending[p] is None, p == MANIFEST_FILE)):
+            text = pending[path]
+            if failed and (path == MANIFEST_FILE or text is None):
+                failed[path] = text
+            elif text is None:
+                if not self._delete_from_github(path):
+                    failed[path] = text
+            elif not self._save_to_github(path, text, conflicts):
+                failed[path] = text
+        self._save_sync_meta()
+
+        if failed:
+            with self._push_lock:
+                # גרסה חדשה יותר שכבר ממתינה גוברת על זו שנכשלה
+                for path, text in failed.items():
+                    self._pending_push.setdefault(path, text)
+            self.show_message(f"שגיאה בשמירה לגיטהאב: {len(failed)} קבצים לא עלו", ft.colors.RED)
+        elif conflicts:
+            self.show_message(
+                f"הנתונים נשמרו בגיטהאב מעל שינויים ממכשיר אחר ({', '.join(conflicts)})",
+                ft.colors.ORANGE
+            )
+        else:
+            self.show_message("הנתונים נשמרו בהצלחה בגיטהאב", ft.colors.GREEN)
+
+    def _save_to_github(self, relative_path, text, conflicts=None):
+        url = self._contents_url(f"DATA/{self.current_user}/{relative_path}")
         
         try:
-            # בדיקה אם הקובץ קיים
-            response = requests.get(url, headers=headers)
-            sha = response.json()["sha"] if response.status_code == 200 else None
-            
             # הכנת התוכן לשמירה
-            content = base64.b64encode(json_data.encode('utf-8')).decode('utf-8')
+            content = base64.b64encode(text.encode('utf-8')).decode('utf-8')
             
             data = {
                 "message": f"עדכון נתונים - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
                 "content": content
             }
             
+            # שימוש ב-SHA השמור; פנייה נוספת לגיטהאב רק אם עדיין אין לנו אחד
+            sha = self.remote_shas.get(relative_path) or self._get_remote_sha(url)
             if sha:
                 data["sha"] = sha
             
             # שליחת העדכון לגיטהאב
-            response = requests.put(url, headers=headers, json=data)
+            response = self.http.put(url, json=data)
+            
+            if response.status_code in [409, 422]:
+                # ה-SHA השמור לא עדכני: הקובץ שונה בגיטהאב ממכשיר אחר. שליפה מחדש
+                # וניסיון נוסף - והמשתמש מקבל הודעה שהגרסה שם נדרסה
+                print(f"התנגשות בשמירה לגיטהאב ({relative_path})")
+                if conflicts is not None:
+                    conflicts.append(relative_path)
+                sha = self._get_remote_sha(url)
+                if sha:
+                    data["sha"] = sha
+                else:
+                    data.pop("sha", None)
+                response = self.http.put(url, json=data)
             
             if response.status_code in [200, 201]:
-                self.show_message("הנתונים נשמרו בהצלחה בגיטהאב", ft.colors.GREEN)
-            else:
-                self.show_message(f"שגיאה בשמירה לגיטהאב: {response.status_code}", ft.colors.RED)
+                self.remote_shas[relative_path] = response.json()["content"]["sha"]
+                return True
+            print(f"שגיאה בשמירה לגיטהאב ({relative_path}): {response.status_code}")
                 
         except Exception as e:
-            self.show_message(f"שגיאה בתקשורת עם גיטהאב: {str(e)}", ft.colors.RED)
+            print(f"שגיאה בתקשורת עם גיטהאב ({relative_path}): {str(e)}")
+        return False
+
+    def _delete_from_github(self, relative_path):
+        """מוחק קובץ מתיקיית הארגון בגיטהאב; קובץ שכבר לא קיים נחשב כנמחק"""
+        url = self._contents_url(f"DATA/{self.current_user}/{relative_path}")
+
+        try:
+            sha = self._get_remote_sha(url)
+            if sha:
+                response = self.http.delete(url, json={
+                    "message": f"מחיקת {relative_path} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+                    "sha": sha
+                })
+                if response.status_code not in [200, 404]:
+                    print(f"שגיאה במחיקה מגיטהאב ({relative_path}): {response.status_code}")
+                    return False
+            self.remote_shas.pop(relative_path, None)
+            return True
+
+        except Exception as e:
+            print(f"שגיאה בתקשורת עם גיטהאב ({relative_path}): {str(e)}")
+        return False
+
+    def _get_remote_sha(self, url):
+        """בדיקה אם הקובץ קיים בגיטהאב והחזרת ה-SHA שלו"""
+        response = self.http.get(url)
+        return response.json()["sha"] if response.status_code == 200 else None
 
     def show_message(self, message, color):
         if self.page:
@@ -274,18 +522,68 @@ class LoginManager:
                 bgcolor=color
             )
             self.page.snack_bar.open = True
-            self.page.update()
+            self.page_updater.request_update()
+
+# אחסון מקומי: "json" - קבצים ויומן שינויים, "sqlite" - מסד נתונים מקומי.
+# נקבע לכל ארגון בשדה "storage" ב-organizations.json
+STORAGE_JSON = "json"
+STORAGE_SQLITE = "sqlite"
 
 class AppManager:
-    def __init__(self):
+    def __init__(self, save_quiet_period=1.0, save_max_delay=5.0, storage_backend=None):
         self.contacts = []
+        # מזהה -> איש קשר, לתרגום תוצאות מהאחסון
+        self.contacts_by_id = {}
         self.events = []
         self.groups = []
+        # אינדקס טלפון מנורמל -> אנשי הקשר עם הטלפון (לפי סדר ההוספה),
+        # לזיהוי כפילויות ב-O(1). כשאחד מהם נמחק, האחרים נשארים באינדקס
+        self.phone_index = {}
+        # אינדקס הפוך: איש קשר -> הקבוצות והאירועים שלו
+        self.membership = MembershipIndex()
+        # אינדקס n-gram לחיפוש אנשי קשר
+        self.search_index = SearchIndex()
+        # חיפוש בזמן הקלדה רץ רק אחרי הפסקה קצרה, ורק על השאילתה האחרונה
+        self.search_debouncer = Debouncer(self.run_debounced_search, delay=0.25)
         self.current_edit_contact = None
         self.login_manager = None
+        # שינויים מקומיים מאז הטעינה - רענון מגיטהאב לא דורס אותם
+        self._local_changes = 0
+        # נעילת הנתונים: פעולות המשתמש, הייבוא, הסנכרון והשמירה ברקע
+        # לא קוראים ומשנים את הרשימות והאינדקסים בו זמנית
+        self.data_lock = threading.RLock()
+        # יומן השינויים המקומי של הארגון; נפתח בטעינת הנתונים
+        self.journal = None
+        # None - לפי הגדרות הארגון
+        self.storage_backend = storage_backend
+        # מסד הנתונים המקומי כשהאחסון הוא sqlite
+        self.backend = None
+        # הקבצים המפוצלים שהשתנו מאז השמירה האחרונה (מוגן ב-data_lock)
+        self._dirty_shards = set()
+        # השמירה הבאה תכתוב תמונת מצב מלאה (אחרי המרה של קובץ ישן)
+        self._full_save_pending = False
+        # היומן עבר את הסף וכבר תוזמן קיפול - לא לתזמן שוב עד שיתבצע
+        self._compaction_requested = False
+
+        # תור שמירה מושהה - ממזג רצף עריכות לשמירה אחת
+        self.save_queue = SaveQueue(
+            self.write_data,
+            quiet_period=save_quiet_period,
+            max_delay=save_max_delay
+        )
+        atexit.register(self.shutdown)
         
         # משתני ממשק
         self.contacts_list_view = None
+        self.load_more_contacts_button = None
+        # רשימת אנשי הקשר המוצגת כרגע (אחרי סינון) וכמה כרטיסים כבר נבנו ממנה
+        self.visible_contacts = []
+        self.rendered_contacts_count = 0
+        self.contacts_page_size = 40
+        # כרטיסים שנבנו - נבנים מחדש רק כשהישות השתנתה
+        self.card_cache = CardCache()
+        # התצוגות שהשתנו מאז הרענון האחרון
+        self.dirty_views = set()
         self.events_grid_view = None
         self.groups_list_view = None
         self.tabs = None
@@ -303,10 +601,24 @@ class AppManager:
         self.group_name_field = None
         self.group_description_field = None
 
+        # ייבוא אנשי קשר ברקע
+        self.import_cancel_event = None
+        self.import_dialog = None
+        self.import_progress_text = None
+
     def initialize_app(self, page: ft.Page):
         self.login_manager = LoginManager()
+        self.login_manager.on_remote_data = self.apply_remote_data
         self.login_manager.create_login_page(page, self.setup_main_page)
 
+    def shutdown(self):
+        """שומר שינויים ממתינים ומחכה שהסנכרון לגיטהאב יסתיים"""
+        self.save_now()
+        if self.login_manager:
+            self.login_manager.sync_worker.stop()
+        if self.backend:
+            self.backend.close()
+
     def setup_main_page(self):
         # הגדרת המסך הראשי
         self.login_manager.page.title = "מערכת ניהול אנשי קשר ואירועים"
@@ -315,6 +627,8 @@ class AppManager:
         self.login_manager.page.padding = 20
         self.login_manager.page.rtl = True
         self.login_manager.page.bgcolor = ft.colors.WHITE
+        # שמירת שינויים ממתינים ביציאה
+        self.login_manager.page.on_disconnect = lambda e: self.save_now()
         
         # יצירת הרכיבים
         self.create_form_fields()
@@ -335,10 +649,17 @@ class AppManager:
             ),
             self.tabs
         )
-        self.login_manager.page.update()
+        self.request_update()
 
     def create_contact_card(self, contact):
         is_selected = contact == self.current_edit_contact
+        return self.card_cache.get(
+            contact,
+            (contact.version, is_selected),
+            lambda: self.build_contact_card(contact, is_selected)
+        )
+
+    def build_contact_card(self, contact, is_selected):
         return ft.Card(
             content=ft.Container(
                 content=ft.Row(
@@ -388,12 +709,18 @@ class AppManager:
         )
 
     def create_event_card(self, event):
+        return self.card_cache.get(event, event.version, lambda: self.build_event_card(event))
+
+    def build_event_card(self, event):
         def delete_event(e, event_to_delete):
-            self.events.remove(event_to_delete)
-            self.events_grid_view.controls = [self.create_event_card(evt) for evt in self.events]
-            self.save_data()
-            self.show_message("האירוע נמחק בהצלחה", ft.colors.RED)
-            self.login_manager.page.update()
+            with self.page_updater.batch(), self.data_lock:
+                self.events.remove(event_to_delete)
+                self.card_cache.discard(event_to_delete)
+                self.membership.forget_event(event_to_delete)
+                self.record_change("event_del", id=event_to_delete.id)
+                self.update_views(VIEW_EVENTS)
+                self.save_data()
+                self.show_message("האירוע נמחק בהצלחה", ft.colors.RED)
 
         return ft.Card(
             content=ft.Container(
@@ -438,6 +765,10 @@ class AppManager:
 
 
     def create_group_card(self, group):
+        # שינוי בחבר קבוצה מסמן גם את הקבוצה (דרך האינדקס ההפוך), כך שהגרסה שלה מספיקה
+        return self.card_cache.get(group, group.version, lambda: self.build_group_card(group))
+
+    def build_group_card(self, group):
         return ft.Card(
             content=ft.Container(
                 content=ft.Column([
@@ -483,7 +814,7 @@ class AppManager:
         )
 
     def create_participant_card(self, participant, status, event, participants_grid):
-        is_confirmed = status == "confirmed"
+        is_confirmed = status == STATUS_CONFIRMED
         return ft.Card(
             content=ft.Container(
                 content=ft.Row(
@@ -563,24 +894,29 @@ class AppManager:
         current_value = self.group_field.value
         if current_value and current_value not in [opt.key for opt in all_options]:
             self.group_field.value = None
-            
-        # עדכון התצוגה
-        if self.login_manager and self.login_manager.page:
-            self.login_manager.page.update()
 
+    @batched_render
     def edit_group(self, group):
         """
         פותח חלון לעריכת פרטי הקבוצה
         """
         def save_changes(e):
-            if new_name_field.value:
-                group.name = new_name_field.value
-                group.description = new_description_field.value
-                self.update_views()
-                self.save_data()
-                dlg.open = False
-                self.login_manager.page.update()
-                self.show_message("הקבוצה עודכנה בהצלחה", ft.colors.GREEN)
+            with self.page_updater.batch(), self.data_lock:
+                if new_name_field.value:
+                    old_name = group.name
+                    group.name = new_name_field.value
+                    group.description = new_description_field.value
+                    group.touch()
+                    self.record_change("group_put", group=self.group_record(group))
+                    # שינוי השם עובר לאנשי הקשר שמשויכים לקבוצה
+                    if group.name != old_name:
+                        for contact in self.membership.contacts_labeled(old_name):
+                            self.set_contact_group(contact, group.name)
+                    self.update_views(VIEW_GROUPS, VIEW_GROUP_OPTIONS, VIEW_CONTACTS)
+                    self.save_data()
+                    dlg.open = False
+                    self.request_update()
+                    self.show_message("הקבוצה עודכנה בהצלחה", ft.colors.GREEN)
 
         new_name_field = ft.TextField(
             label="שם הקבוצה",
@@ -612,23 +948,27 @@ class AppManager:
 
         self.login_manager.page.dialog = dlg
         dlg.open = True
-        self.login_manager.page.update()
+        self.request_update()
 
+    @batched_render
     def delete_group(self, group):
         """
         מוחק קבוצה מהמערכת
         """
         def confirm_delete(e):
-            self.groups.remove(group)
-            # עדכון אנשי הקשר ששייכים לקבוצה
-            for contact in self.contacts:
-                if contact.group == group.name:
-                    contact.group = None
-            self.update_views()
-            self.save_data()
-            dlg.open = False
-            self.login_manager.page.update()
-            self.show_message("הקבוצה נמחקה בהצלחה", ft.colors.RED)
+            with self.page_updater.batch(), self.data_lock:
+                self.groups.remove(group)
+                self.card_cache.discard(group)
+                self.membership.forget_group(group)
+                self.record_change("group_del", id=group.id)
+                # עדכון אנשי הקשר ששייכים לקבוצה - רק הם, בלי לסרוק את כולם
+                for contact in self.membership.contacts_labeled(group.name):
+                    self.set_contact_group(contact, None)
+                self.update_views(VIEW_GROUPS, VIEW_GROUP_OPTIONS, VIEW_CONTACTS)
+                self.save_data()
+                dlg.open = False
+                self.request_update()
+                self.show_message("הקבוצה נמחקה בהצלחה", ft.colors.RED)
 
         dlg = ft.AlertDialog(
             title=ft.Text("מחיקת קבוצה"),
@@ -642,23 +982,24 @@ class AppManager:
 
         self.login_manager.page.dialog = dlg
         dlg.open = True
-        self.login_manager.page.update()
+        self.request_update()
 
+    @batched_render
     def toggle_group_member(self, e, group, contact):
         """
         מוסיף או מסיר חבר מקבוצה
         """
         if e.control.value:  # אם הצ'קבוקס נבחר
             if contact not in group.members:
-                group.members.append(contact)
-                contact.group = group.name
+                self.add_group_member(group, contact)
+                self.set_contact_group(contact, group.name)
         else:  # אם הצ'קבוקס בוטל
             if contact in group.members:
-                group.members.remove(contact)
+                self.remove_group_member(group, contact)
                 if contact.group == group.name:
-                    contact.group = None
+                    self.set_contact_group(contact, None)
         
-        self.update_views()
+        self.update_views(VIEW_GROUPS, VIEW_CONTACTS)
         self.save_data()
         
     def create_form_fields(self):
@@ -699,7 +1040,7 @@ class AppManager:
             label="חיפוש",
             width=200,
             prefix_icon=ft.Icons.SEARCH,
-            on_change=lambda e: self.filter_contacts(e.control.value)
+            on_change=lambda e: self.search_debouncer.call(e.control.value)
         )
 
         # שדות טופס אירועים
@@ -749,12 +1090,17 @@ class AppManager:
             prefix_icon=ft.Icons.DESCRIPTION
         )
     def create_list_views(self):
-        # יצירת תצוגת אנשי קשר
+        # יצירת תצוגת אנשי קשר - נבנים רק הכרטיסים שבחלון, והשאר נטענים בגלילה
         self.contacts_list_view = ft.ListView(
             expand=True,
             spacing=10,
             padding=20,
-            height=400
+            height=400,
+            on_scroll=self.on_contacts_scroll,
+            on_scroll_interval=100
+        )
+        self.load_more_contacts_button = ft.TextButton(
+            on_click=lambda e: self.load_more_contacts()
         )
 
         # יצירת תצוגת אירועים
@@ -974,6 +1320,7 @@ class AppManager:
         ])
 
     # פונקציות ניהול אנשי קשר
+    @batched_render
     def add_or_update_contact(self, e):
         if not self.name_field.value:
             self.show_message("אנא הזן שם!", ft.colors.RED)
@@ -982,17 +1329,26 @@ class AppManager:
             self.show_message("אנא הזן מספר טלפון!", ft.colors.RED)
             return
 
+        is_new = self.current_edit_contact is None
         if self.current_edit_contact:
             # עדכון איש קשר קיים
             if self.current_edit_contact.group:
                 old_group = next((g for g in self.groups if g.name == self.current_edit_contact.group), None)
-                if old_group and self.current_edit_contact in old_group.members:
-                    old_group.members.remove(self.current_edit_contact)
+                if old_group:
+                    self.remove_group_member(old_group, self.current_edit_contact)
 
+            self.unindex_contact_phone(self.current_edit_contact)
             self.current_edit_contact.name = self.name_field.value
             self.current_edit_contact.phone = self.phone_field.value
+            self.index_contact_phone(self.current_edit_contact)
             self.current_edit_contact.email = self.email_field.value
-            self.current_edit_contact.group = self.group_field.value
+            self.set_contact_group(self.current_edit_contact, self.group_field.value)
+            self.current_edit_contact.refresh_search_keys()
+            self.current_edit_contact.touch()
+            # כרטיסי הקבוצות מציגים את שמות החברים
+            for group in self.membership.groups_of(self.current_edit_contact):
+                group.touch()
+            self.search_index.update(self.current_edit_contact)
             contact = self.current_edit_contact
             self.show_message("איש הקשר עודכן בהצלחה", ft.colors.GREEN)
             self.current_edit_contact = None
@@ -1005,18 +1361,25 @@ class AppManager:
                 self.group_field.value
             )
             self.contacts.append(contact)
+            self.contacts_by_id[contact.id] = contact
+            self.index_contact_phone(contact)
+            self.search_index.add(contact)
+            self.membership.relabel(contact, None, contact.group)
             self.show_message("איש הקשר נוסף בהצלחה", ft.colors.GREEN)
 
+        self.record_change("contact_put", contact=self.contact_record(contact), new=is_new)
+
         # עדכון שיוך לקבוצה
         if contact.group:
             new_group = next((g for g in self.groups if g.name == contact.group), None)
-            if new_group and contact not in new_group.members:
-                new_group.members.append(contact)
+            if new_group:
+                self.add_group_member(new_group, contact)
 
         self.clear_contact_fields()
-        self.update_views()
+        self.update_views(VIEW_CONTACTS, VIEW_GROUPS)
         self.save_data()
 
+    @batched_render
     def edit_contact(self, contact):
         self.current_edit_contact = contact
         self.name_field.value = contact.name
@@ -1024,28 +1387,167 @@ class AppManager:
         self.email_field.value = contact.email
         self.group_field.value = contact.group
         self.filter_contacts("")
-        self.login_manager.page.update()
+        self.request_update()
 
+    @batched_render
     def delete_contact(self, contact):
         self.contacts.remove(contact)
-        self.filter_contacts("")
-        self.update_participants_list()
+        self.contacts_by_id.pop(contact.id, None)
+        self.card_cache.discard(contact)
+        self.unindex_contact_phone(contact)
+        self.search_index.remove(contact)
+
+        # הסרה מהקבוצות ומהאירועים שלו בלבד - לפי האינדקס ההפוך
+        for group in self.membership.groups_of(contact):
+            self.remove_group_member(group, contact)
+        for event in self.membership.events_of(contact):
+            self.remove_event_participant(event, contact)
+        self.membership.forget_contact(contact)
+        self.record_change("contact_del", id=contact.id)
+
+        if self.current_edit_contact is contact:
+            self.current_edit_contact = None
+            self.clear_contact_fields()
+
+        self.update_views(VIEW_CONTACTS, VIEW_GROUPS)
+        self.save_data()
         self.show_message("איש הקשר נמחק בהצלחה", ft.colors.RED)
-        self.login_manager.page.update()
 
-    def filter_contacts(self, search_text):
+    def add_group_member(self, group, contact):
+        if contact not in group.members:
+            group.members.append(contact)
+            self.membership.link_group(contact, group)
+            group.touch()
+            self.record_change("member_add", group=group.id, contact=contact.id)
+
+    def remove_group_member(self, group, contact):
+        if contact in group.members:
+            group.members.remove(contact)
+            self.membership.unlink_group(contact, group)
+            group.touch()
+            self.record_change("member_del", group=group.id, contact=contact.id)
+
+    def set_contact_group(self, contact, group_name):
+        if contact.group != group_name:
+            self.membership.relabel(contact, contact.group, group_name)
+            contact.group = group_name
+            contact.touch()
+            self.record_change("contact_put", contact=self.contact_record(contact))
+
+    def add_event_participant(self, event, contact, pending=False):
+        target = event.pending_participants if pending else event.participants
+        if contact not in target:
+            target.append(contact)
+            self.membership.link_event(contact, event)
+            event.touch()
+            self.record_change("participant_set", event=event.id, contact=contact.id, pending=pending)
+
+    def remove_event_participant(self, event, contact):
+        event.participants.discard(contact)
+        event.pending_participants.discard(contact)
+        event.pending_notes.pop(contact, None)
+        self.membership.unlink_event(contact, event)
+        event.touch()
+        self.record_change("participant_del", event=event.id, contact=contact.id)
+
+    def groups_of_contact(self, contact):
+        """הקבוצות שאיש הקשר חבר בהן"""
+        return self.membership.groups_of(contact)
+
+    def events_of_contact(self, contact):
+        """האירועים שאיש הקשר משתתף בהם (מאושר או ממתין)"""
+        return self.membership.events_of(contact)
+
+    def index_contact_phone(self, contact):
+        key = normalize_phone(contact.phone)
+        if key:
+            self.phone_index.setdefault(key, []).append(contact)
+
+    def unindex_contact_phone(self, contact):
+        key = normalize_phone(contact.phone)
+        holders = self.phone_index.get(key)
+        if holders and contact in holders:
+            holders.remove(contact)
+            if not holders:
+                del self.phone_index[key]
+
+    def rebuild_phone_index(self):
+        self.phone_index = {}
+        for contact in self.contacts:
+            self.index_contact_phone(contact)
+
+    def find_contact_by_phone(self, phone):
+        holders = self.phone_index.get(normalize_phone(phone))
+        return holders[0] if holders else None
+
+    def search_contacts(self, search_text):
         if not search_text:
-            self.contacts_list_view.controls = [self.create_contact_card(contact) for contact in self.contacts]
-        else:
-            filtered = [
-                contact for contact in self.contacts
-                if search_text.lower() in contact.name.lower() or
-                   search_text in contact.phone or
-                   search_text.lower() in contact.email.lower()
-            ]
-            self.contacts_list_view.controls = [self.create_contact_card(contact) for contact in filtered]
-        self.login_manager.page.update()
+            return self.contacts
+        if self.backend:
+            try:
+                return [
+                    self.contacts_by_id[contact_id]
+                    for contact_id in self.backend.search(search_text)
+                    if contact_id in self.contacts_by_id
+                ]
+            except Exception as e:
+                print(f"שגיאה בחיפוש במסד הנתונים: {str(e)}")
+        return self.search_index.search(search_text)
+
+    def show_contacts(self, contacts):
+        self.render_contacts(contacts)
+        self.request_update()
+
+    def render_contacts(self, contacts):
+        """מציג את הרשימה מההתחלה - נבנה רק העמוד הראשון של כרטיסים"""
+        self.visible_contacts = contacts
+        self.rendered_contacts_count = 0
+        self.contacts_list_view.controls = []
+        self.append_contacts_page()
+
+    def append_contacts_page(self):
+        controls = self.contacts_list_view.controls
+        if controls and controls[-1] is self.load_more_contacts_button:
+            controls.pop()
+
+        start = self.rendered_contacts_count
+        end = min(start + self.contacts_page_size, len(self.visible_contacts))
+        controls.extend(
+            self.create_contact_card(contact)
+            for contact in self.visible_contacts[start:end]
+        )
+        self.rendered_contacts_count = end
+
+        # כפתור לטעינת המשך, למקרה שאין גלילה (למשל חלון גבוה)
+        if end < len(self.visible_contacts):
+            self.load_more_contacts_button.text = f"טען עוד ({end} מתוך {len(self.visible_contacts)})"
+            controls.append(self.load_more_contacts_button)
 
+    @batched_render
+    def load_more_contacts(self):
+        if self.rendered_contacts_count >= len(self.visible_contacts):
+            return
+        self.append_contacts_page()
+        # עדכון הרשימה בלבד - נשלחים רק הכרטיסים החדשים
+        self.request_update(self.contacts_list_view)
+
+    def on_contacts_scroll(self, e):
+        # טעינת העמוד הבא כשמתקרבים לסוף הרשימה
+        if e.pixels >= e.max_scroll_extent - 300:
+            self.load_more_contacts()
+
+    def filter_contacts(self, search_text):
+        self.search_debouncer.cancel()
+        self.show_contacts(self.search_contacts(search_text))
+
+    def run_debounced_search(self, generation, search_text):
+        """רץ אחרי שההקלדה נרגעה; תוצאה של שאילתה שהתיישנה בינתיים לא מוצגת"""
+        filtered = self.search_contacts(search_text)
+        if not self.search_debouncer.is_current(generation):
+            return
+        self.show_contacts(filtered)
+
+    @batched_render
     def add_event(self, e):
         if not self.event_title.value:
             self.show_message("אנא הזן כותרת לאירוע!", ft.colors.RED)
@@ -1065,25 +1567,20 @@ class AppManager:
             self.event_location.value if self.event_location.value else ""
         )
         
-        # איתחול רשימות המשתתפים
-        new_event.participants = []
-        new_event.pending_participants = []
-        new_event.pending_notes = {}
-        
         # הוספת האירוע לרשימת האירועים
         self.events.append(new_event)
+        self.record_change("event_put", event=self.event_record(new_event))
         
-        # עדכון התצוגה
-        self.events_grid_view.controls = [self.create_event_card(event) for event in self.events]
+        # ניקוי השדות ועדכון התצוגה
+        self.clear_event_fields()
+        self.update_views(VIEW_EVENTS)
         
         # שמירת הנתונים
         self.save_data()
         
-        # ניקוי השדות והצגת הודעה
-        self.clear_event_fields()
         self.show_message("האירוע נוסף בהצלחה", ft.colors.GREEN)
-        self.login_manager.page.update()
 
+    @batched_render
     def import_contacts_from_excel(self, e):
         """פתיחת חלון בחירת קובץ אקסל"""
         try:
@@ -1094,96 +1591,160 @@ class AppManager:
             
             # הוספת הדיאלוג לדף
             self.login_manager.page.overlay.append(pick_files_dialog)
-            self.login_manager.page.update()
+            self.request_update()
             
             # פתיחת הדיאלוג
             pick_files_dialog.pick_files(
-                allowed_extensions=["xlsx", "xls"]
+                allowed_extensions=["xlsx", "xls", "csv"]
             )
             
         except Exception as e:
             print(f"שגיאה: {str(e)}")  # הדפסה לדיבאג
-            se
-            lf.show_message(f"שגיאה בפתיחת חלון בחירת קובץ: {str(e)}", ft.Colors.RED)
+            self.show_message(f"שגיאה בפתיחת חלון בחירת קובץ: {str(e)}", ft.Colors.RED)
 
+    @batched_render
     def process_excel_file(self, e: ft.FilePickerResultEvent):
-        try:
-            if not e.files or not e.files[0].path:
-                print("לא נבחר קובץ")
-                return
+        if not e.files or not e.files[0].path:
+            print("לא נבחר קובץ")
+            return
 
-            file_path = e.files[0].path
-            print(f"נבחר קובץ: {file_path}")
-            
-            df = pd.read_excel(file_path)
-            print(f"קראתי את הקובץ. מספר שורות: {len(df)}")
-            
-            if df.empty:
-                self.show_message("הקובץ ריק", ft.Colors.RED)
-                return
+        if self.import_cancel_event:
+            self.show_message("ייבוא אחר עדיין מתבצע", ft.Colors.ORANGE)
+            return
 
-            # לוקחים את העמודה הראשונה כעמודת שם
-            name_column = df.columns[0]
-            second_column = df.columns[1] if len(df.columns) > 1 else None
-            
-            # חיפוש עמודת טלפון
+        file_path = e.files[0].path
+        print(f"נבחר קובץ: {file_path}")
+
+        # הייבוא רץ ברקע - הממשק נשאר זמין ומציג התקדמות וכפתור ביטול
+        self.import_cancel_event = threading.Event()
+        self.show_import_progress_dialog()
+        threading.Thread(
+            target=self.run_import,
+            args=(file_path, self.import_cancel_event),
+            name="excel-import",
+            daemon=True
+        ).start()
+
+    def show_import_progress_dialog(self):
+        self.import_progress_text = ft.Text("מתחיל בקריאת הקובץ...")
+        self.import_dialog = ft.AlertDialog(
+            modal=True,
+            title=ft.Text("ייבוא אנשי קשר"),
+            content=ft.Column([
+                ft.ProgressBar(width=300),
+                self.import_progress_text
+            ], tight=True),
+            actions=[
+                ft.TextButton("ביטול", on_click=lambda e: self.cancel_import())
+            ],
+            actions_alignment=ft.MainAxisAlignment.END
+        )
+        self.login_manager.page.dialog = self.import_dialog
+        self.import_dialog.open = True
+        self.request_update()
+
+    def update_import_progress(self, rows_read, accepted, rejected, duplicates):
+        self.import_progress_text.value = (
+            f"נקראו: {rows_read} שורות\n"
+            f"התקבלו: {accepted}\n"
+            f"נדחו: {rejected}\n"
+            f"כפילויות: {duplicates}"
+        )
+        self.request_update()
+
+    @batched_render
+    def cancel_import(self):
+        if self.import_cancel_event:
+            self.import_cancel_event.set()
+            self.import_progress_text.value = "מבטל..."
+            self.request_update()
+
+    def close_import_dialog(self):
+        if self.import_dialog:
+            self.import_dialog.open = False
+            self.import_dialog = None
+            self.request_update()
+
+    def run_import(self, file_path, cancel_event):
+        """רץ בתהליכון נפרד: קורא את הקובץ במנות ומדווח התקדמות אחרי כל מנה"""
+        chunks = iter_contact_chunks(file_path)
+        try:
             phone_column = None
-            for column in df.columns:
-                current_values = df[column].astype(str).str.strip()
-                cleaned_values = current_values.str.replace('-', '')
-                valid_phones = cleaned_values.str.match(r'^0\d{8,9}$')
-                if valid_phones.mean() > 0.5:
-                    phone_column = column
-                    break
-
-            if not phone_column:
-                self.show_message("לא נמצאה עמודת טלפון תקינה", ft.Colors.RED)
-                return
-
-            print(f"עמודת טלפון שנבחרה: {phone_column}")
-
-            # ייבוא אנשי הקשר
-            success_count = 0
+            rows_read = 0
             error_count = 0
             duplicates = 0
+            # אנשי הקשר החדשים נאספים כאן ומוחלים רק בסוף, בעדכון אחד
+            new_contacts = []
+            new_phones = {}
+            known_phones = ChainMap(new_phones, self.phone_index)
 
-            for _, row in df.iterrows():
-                # מחברים את העמודה הראשונה עם השנייה אם היא קיימת ומכילה טקסט
-                name = str(row[name_column]).strip()
-                
-                if second_column:
-                    second_value = str(row[second_column]).strip()
-                    # בודקים אם העמודה השנייה מכילה טקסט (לא מספרים)
-                    if second_value and not second_value.replace('-', '').isdigit():
-                        name = f"{name} {second_value}"
-                
-                phone = str(row[phone_column]).strip().replace('-', '')
-
-                if pd.isna(name) or pd.isna(phone):
-                    error_count += 1
-                    continue
+            for chunk in chunks:
+                if cancel_event.is_set():
+                    break
 
-                if not re.match(r'^0\d{8,9}$', phone):
-                    error_count += 1
-                    continue
+                if phone_column is None:
+                    # זיהוי עמודת הטלפון לפי מדגם מתחילת הקובץ
+                    phone_column = detect_phone_column(chunk.head(PHONE_SAMPLE_ROWS))
+                    if phone_column is None:
+                        self.close_import_dialog()
+                        self.show_message("לא נמצאה עמודת טלפון תקינה", ft.Colors.RED)
+                        return
+                    print(f"עמודת טלפון שנבחרה: {phone_column}")
+
+                rows_read += len(chunk)
+
+                # ניקוי, בדיקה וסינון כפילויות על כל המנה בבת אחת -
+                # מול אנשי הקשר הקיימים ומול מה שכבר נקרא מהקובץ
+                frame, stats = prepare_contacts_frame(chunk, phone_column, known_phones)
+                error_count += stats["errors"]
+                duplicates += stats["duplicates"]
+
+                for name, phone in zip(frame["name"], frame["phone"]):
+                    new_contacts.append(Contact(
+                        name=name,
+                        phone=phone,
+                        email="",
+                        group=""
+                    ))
+                    new_phones[phone] = None
+
+                self.update_import_progress(rows_read, len(new_contacts), error_count, duplicates)
+
+            if cancel_event.is_set():
+                self.close_import_dialog()
+                self.show_message("הייבוא בוטל - לא נוספו אנשי קשר", ft.Colors.ORANGE)
+                return
 
-                if any(contact.phone == phone for contact in self.contacts):
-                    duplicates += 1
-                    continue
+            print(f"קראתי את הקובץ. מספר שורות: {rows_read}")
+            self.close_import_dialog()
 
-                new_contact = Contact(
-                    name=name,
-                    phone=phone,
-                    email="",
-                    group=""
-                )
-                
-                self.contacts.append(new_contact)
-                success_count += 1
+            if rows_read == 0:
+                self.show_message("הקובץ ריק", ft.Colors.RED)
+                return
 
-            # עדכון הממשק
-            self.update_views()
-            self.save_data()
+            # החלת כל אנשי הקשר החדשים בבת אחת, תחת נעילת הנתונים -
+            # בזמן הקריאה הממשק המשיך להוסיף ולמחוק אנשי קשר
+            with self.page_updater.batch(), self.data_lock:
+                # טלפון שנוסף מהממשק בזמן שהקובץ נקרא הוא כפילות
+                accepted = [
+                    contact for contact in new_contacts
+                    if normalize_phone(contact.phone) not in self.phone_index
+                ]
+                duplicates += len(new_contacts) - len(accepted)
+                for contact in accepted:
+                    self.contacts.append(contact)
+                    self.contacts_by_id[contact.id] = contact
+                    self.index_contact_phone(contact)
+                    self.search_index.add(contact)
+                self.record_changes([
+                    {"op": "contact_put", "contact": self.contact_record(contact), "new": True}
+                    for contact in accepted
+                ])
+                success_count = len(accepted)
+
+                # עדכון הממשק
+                self.update_views(VIEW_CONTACTS)
+                self.save_data()
 
             # הצגת סיכום
             summary = f"""ייבוא הסתיים:
@@ -1195,8 +1756,13 @@ class AppManager:
 
         except Exception as e:
             print(f"שגיאה בעיבוד הקובץ: {str(e)}")
+            self.close_import_dialog()
             self.show_message(f"שגיאה בעיבוד הקובץ: {str(e)}", ft.Colors.RED)
+        finally:
+            chunks.close()
+            self.import_cancel_event = None
         
+    @batched_render
     def manage_event(self, event):
         """מנהל את תצוגת האירוע ומשתתפיו"""
         if not event or not self.login_manager or not self.login_manager.page:
@@ -1204,9 +1770,9 @@ class AppManager:
 
         # וידוא שכל המשתנים קיימים
         if not hasattr(event, 'participants'):
-            event.participants = []
+            event.participants = MemberSet()
         if not hasattr(event, 'pending_participants'):
-            event.pending_participants = []
+            event.pending_participants = MemberSet()
         if not hasattr(event, 'pending_notes'):
             event.pending_notes = {}
 
@@ -1217,7 +1783,7 @@ class AppManager:
             for i, tab in enumerate(self.tabs.tabs):
                 if tab.text == event_tab_text:
                     self.tabs.selected_index = i
-                    self.login_manager.page.update()
+                    self.request_update()
                     return
 
         # יצירת הרשתות
@@ -1305,7 +1871,7 @@ class AppManager:
                 available_cards.append(card)
 
             available_contacts_grid.controls = available_cards
-            self.login_manager.page.update()
+            self.request_update()
 
         # יצירת תוכן הכרטיסייה
         event_content = ft.Column([
@@ -1346,6 +1912,7 @@ class AppManager:
         # עדכון ראשוני של המשתתפים
         update_event_participants()
 
+    @batched_render
     def close_event_tab(self, event):
         """סוגר את כרטיסיית האירוע"""
         if self.tabs and self.tabs.tabs:
@@ -1353,16 +1920,17 @@ class AppManager:
                 if tab.text == f"אירוע: {event.title}":
                     self.tabs.tabs.pop(i)
                     self.tabs.selected_index = 2  # חזרה ללשונית האירועים
-                    self.login_manager.page.update()
+                    self.request_update()
                     break        
         
         def on_tab_change(e):
             update_event_participants()
-            self.login_manager.page.update()
+            self.request_update()
 
 
 
     # פונקציות ניהול קבוצות
+    @batched_render
     def add_group(self, e):
         if not self.group_name_field.value:
             self.show_message("אנא הזן שם קבוצה!", ft.colors.RED)
@@ -1373,15 +1941,15 @@ class AppManager:
             self.group_description_field.value
         )
         self.groups.append(new_group)
-        self.groups_list_view.controls.append(self.create_group_card(new_group))
+        self.record_change("group_put", group=self.group_record(new_group))
         
-        self.update_group_options()
         self.clear_group_fields()
+        self.update_views(VIEW_GROUPS, VIEW_GROUP_OPTIONS)
         
         self.show_message("הקבוצה נוספה בהצלחה", ft.colors.GREEN)
-        self.login_manager.page.update()
         self.save_data()
 
+    @batched_render
     def enter_group(self, group):
         dlg = ft.AlertDialog(
             title=ft.Text(f"קבוצה: {group.name}"),
@@ -1402,7 +1970,7 @@ class AppManager:
         )
         self.login_manager.page.dialog = dlg
         dlg.open = True
-        self.login_manager.page.update()
+        self.request_update()
 
     # פונקציות עזר
     def clear_contact_fields(self):
@@ -1421,12 +1989,42 @@ class AppManager:
         self.group_name_field.value = ""
         self.group_description_field.value = ""
 
-    def update_views(self):
-        self.contacts_list_view.controls = [self.create_contact_card(contact) for contact in self.contacts]
-        self.events_grid_view.controls = [self.create_event_card(event) for event in self.events]
-        self.groups_list_view.controls = [self.create_group_card(group) for group in self.groups]
-        self.update_group_options()
-        self.login_manager.page.update()
+    @property
+    def page_updater(self):
+        return self.login_manager.page_updater
+
+    def request_update(self, *controls):
+        """מבקש עדכון של הדף (או של רכיבים מסוימים); בתוך פעולת משתמש נשלח עדכון אחד בסופה"""
+        self.page_updater.request_update(*controls)
+
+    def mark_views_dirty(self, *views):
+        """מסמן אילו תצוגות השתנו; הרענון עצמו ב-update_views"""
+        self.dirty_views.update(views)
+
+    def update_views(self, *views):
+        """
+        מרענן רק את התצוגות שסומנו כמלוכלכות (ואת אלו שהועברו כפרמטר),
+        ושולח ללקוח עדכון רק של הרכיבים שלהן
+        """
+        self.mark_views_dirty(*views)
+        dirty, self.dirty_views = self.dirty_views, set()
+
+        changed_controls = []
+        if VIEW_CONTACTS in dirty:
+            self.render_contacts(self.contacts)
+            changed_controls.append(self.contacts_list_view)
+        if VIEW_EVENTS in dirty:
+            self.events_grid_view.controls = [self.create_event_card(event) for event in self.events]
+            changed_controls.append(self.events_grid_view)
+        if VIEW_GROUPS in dirty:
+            self.groups_list_view.controls = [self.create_group_card(group) for group in self.groups]
+            changed_controls.append(self.groups_list_view)
+        if VIEW_GROUP_OPTIONS in dirty:
+            self.update_group_options()
+            changed_controls.append(self.group_field)
+
+        if changed_controls:
+            self.request_update(*changed_controls)
 
     def show_message(self, message, color):
         self.login_manager.page.snack_bar = ft.SnackBar(
@@ -1434,63 +2032,288 @@ class AppManager:
             bgcolor=color
         )
         self.login_manager.page.snack_bar.open = True
-        self.login_manager.page.update()
+        self.request_update()
 
     def save_data(self):
+        """
+        השינויים עצמם כבר נרשמו ב-record_changes. ב-SQLite הקבצים המפוצלים
+        נכתבים ברקע בתור השמירה; ביומן JSON השינויים נשארים ביומן, ומקופלים
+        לקבצים רק כשהוא עובר את הסף או ביציאה (save_now)
+        """
+        if self.backend:
+            self.save_queue.mark_dirty()
+
+    def save_now(self):
+        """כותב מיד את כל מה שעוד לא נשמר לקבצים (ביציאה) ומקפל את היומן"""
+        with self.data_lock:
+            pending = bool(self._dirty_shards) or self._full_save_pending
+        if pending:
+            self.save_queue.mark_dirty()
+        self.save_queue.flush()
+
+    def request_compaction(self):
+        """מתזמן קיפול של היומן לקבצים כשהוא עובר את הסף - פעם אחת עד שיתבצע"""
+        if self.journal and not self._compaction_requested and self.journal.needs_compaction():
+            self._compaction_requested = True
+            self.save_queue.mark_dirty()
+
+    @staticmethod
+    def contact_record(contact):
+        return {
+            "id": contact.id,
+            "name": contact.name,
+            "phone": contact.phone,
+            "email": contact.email,
+            "group": contact.group
+        }
+
+    @staticmethod
+    def event_record(event):
+        """פרטי האירוע בלי המשתתפים"""
+        return {
+            "id": event.id,
+            "title": event.title,
+            "date": event.date,
+            "time": event.time,
+            "location": event.location
+        }
+
+    @staticmethod
+    def group_record(group):
+        """פרטי הקבוצה בלי החברים"""
+        return {
+            "id": group.id,
+            "name": group.name,
+            "description": group.description
+        }
+
+    def record_change(self, op, **fields):
+        self.record_changes([dict(fields, op=op)])
+
+    def record_changes(self, records):
+        """
+        רושם שינויים ביומן - נכתבים לדיסק מיד, עוד לפני השמירה המלאה -
+        ומסמן את הקבצים המפוצלים שהשינויים נוגעים בהם, לשמירה הבאה.
+        כשהיומן גדל מעבר לסף, מתוזמנת שמירה שמקפלת אותו.
+        """
+        with self.data_lock:
+            self._local_changes += len(records)
+            if self.backend:
+                # ב-SQLite כל שינוי הוא טרנזקציה על השורות שלו
+                try:
+                    self._dirty_shards |= self.backend.apply(records)
+                except Exception as e:
+                    print(f"שגיאה בשמירה למסד הנתונים: {str(e)}")
+                return
+            for record in records:
+                self._dirty_shards |= record_shards(record)
+            if self.journal is None:
+                return
+            try:
+                self.journal.append_many(records)
+                self.request_compaction()
+            except OSError as e:
+                print(f"שגיאה ברישום ליומן השינויים: {str(e)}")
+
+    def write_data(self):
+        """
+        רץ מתור השמירה: כותב רק את הקבצים המפוצלים שהשינויים נגעו בהם, ומחשב
+        תקציר רק להם. תמונת מצב מלאה נכתבת רק כשעוד אין קבצים מפוצלים (הרצה
+        ראשונה) או אחרי המרה. שמירה שנכשלה זורקת חריגה, והתור ינסה שוב.
+        """
+        storage = self.login_manager.storage
+        # הקבצים נבנים תחת נעילת הנתונים - הממשק לא משנה אותם באמצע
+        with self.data_lock:
+            full = self._full_save_pending or storage is None or not storage.has_manifest()
+            if not full and not self._dirty_shards:
+                return
+            # השינויים שנרשמו עד עכשיו נכללים בשמירה; חדשים ייכתבו ליומן חדש
+            if self.journal:
+                self.journal.rotate()
+            paths, self._dirty_shards = self._dirty_shards, set()
+            self._full_save_pending = False
+            self._compaction_requested = False
+            if full:
+                data = self.snapshot()
+            else:
+                # ב-SQLite הקבצים נבנים מהמסד, אחרת מהנתונים שבזיכרון
+                shards = (self.backend or self).export_shards(paths)
+
+        saved = False
         try:
-            data = {
-                "contacts": [
-                    {
-                        "name": contact.name,
-                        "phone": contact.phone,
-                        "email": contact.email,
-                        "group": contact.group
-                    }
-                    for contact in self.contacts
-                ],
-                "events": [
-                    {
-                        "title": event.title,
-                        "date": event.date,
-                        "time": event.time,
-                        "location": event.location,
-                        "participants": [p.name for p in event.participants if p],
-                        "pending_participants": [p.name for p in event.pending_participants if p],
-                        "pending_notes": {p.name: note for p, note in event.pending_notes.items() if p}
-                    }
-                    for event in self.events
-                ],
-                "groups": [
-                    {
-                        "name": group.name,
-                        "description": group.description,
-                        "members": [member.name for member in group.members if member]
-                    }
-                    for group in self.groups
-                ]
-            }
-            
-            # שמירת הנתונים
-            if self.login_manager.save_organization_data(data):
-                print("הנתונים נשמרו בהצלחה")
+            if full:
+                saved = self.login_manager.save_organization_data(data)
             else:
-                print("שגיאה בשמירת הנתונים")
-                
-        except Exception as e:
-            print(f"שגיאה בשמירת הנתונים: {str(e)}")
+                saved = self.login_manager.save_organization_shards(shards, SCHEMA_VERSION)
+        finally:
+            if not saved:
+                # הקבצים יישמרו בניסיון הבא של תור השמירה
+                with self.data_lock:
+                    self._dirty_shards |= paths
+                    self._full_save_pending = self._full_save_pending or full
+        if not saved:
+            raise RuntimeError("שגיאה בשמירת הנתונים")
+
+        # השינויים בקבצים על הדיסק - היומן שהוקפא כבר מיותר
+        if self.journal:
+            self.journal.discard_rotated()
+        print("הנתונים נשמרו בהצלחה")
+
+    def export_shards(self, paths):
+        """התוכן של קבצים מפוצלים מסוימים מהנתונים שבזיכרון, כמו ב-split_data"""
+        shards = {}
+        contact_shards = {
+            path: [] for path in paths
+            if path.startswith("contacts/") and path != ORDER_FILE
+        }
+        if contact_shards:
+            for contact in self.contacts:
+                records = contact_shards.get(contact_shard_path(contact.id))
+                if records is not None:
+                    records.append(self.contact_record(contact))
+            for path, records in contact_shards.items():
+                shards[path] = serialize(records)
+        if ORDER_FILE in paths:
+            shards[ORDER_FILE] = serialize([contact.id for contact in self.contacts])
+        if EVENTS_FILE in paths:
+            shards[EVENTS_FILE] = serialize(self.events_snapshot())
+        if GROUPS_FILE in paths:
+            shards[GROUPS_FILE] = serialize(self.groups_snapshot())
+        return shards
+
+    def snapshot(self):
+        """כל הנתונים במבנה של data.json"""
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "contacts": [self.contact_record(contact) for contact in self.contacts],
+            "events": self.events_snapshot(),
+            "groups": self.groups_snapshot()
+        }
+
+    def events_snapshot(self):
+        return [
+            dict(
+                self.event_record(event),
+                participants=[p.id for p in event.participants if p],
+                pending_participants=[p.id for p in event.pending_participants if p],
+                pending_notes={p.id: note for p, note in event.pending_notes.items() if p}
+            )
+            for event in self.events
+        ]
+
+    def groups_snapshot(self):
+        return [
+            dict(
+                self.group_record(group),
+                members=[member.id for member in group.members if member]
+            )
+            for group in self.groups
+        ]
 
-        
     def load_data(self):
+        # רענון מגיטהאב ברקע (apply_remote_data) ממתין עד שהטעינה מסתיימת
+        with self.data_lock:
+            return self._load_data()
+
+    def _load_data(self):
+        if self.storage_backend is None:
+            self.storage_backend = self.login_manager.organization_settings.get("storage", STORAGE_JSON)
+        if self.storage_backend == STORAGE_SQLITE:
+            return self.load_data_from_sqlite()
+
         data = self.login_manager.load_organization_data()
+        self.journal = ChangeJournal(self.login_manager._org_folder())
+        data, records = self.replay_journal(data, self.journal)
+
+        loaded = self.apply_data(data)
+        # השינויים ששוחזרו נספרים כעריכות מקומיות, כך שרענון מגיטהאב לא
+        # ידרוס אותם. הם נשארים ביומן, ומקופלים רק אם הוא כבר עבר את הסף
+        self._local_changes = len(records)
+        self.request_compaction()
+        return loaded
+
+    def replay_journal(self, data, journal):
+        """
+        מחיל על הנתונים את השינויים מהיומן שלא הספיקו להיכנס לקבצים (למשל
+        קריסה באמצע שמירה) ומסמן את הקבצים שהם משנים. מחזיר (נתונים, רשומות)
+        """
+        if data is not None and data.get("schema_version", 1) < SCHEMA_VERSION:
+            # תמונת מצב ישנה: המזהים ביומן שייכים להמרה שלא נשמרה, וההמרה
+            # הנוכחית תיצור מזהים אחרים - אי אפשר להתאים אותם
+            journal.discard()
+            return data, []
+        records = journal.records()
+        if records:
+            data = replay(data or {"schema_version": SCHEMA_VERSION}, records)
+            for record in records:
+                self._dirty_shards |= record_shards(record)
+        return data, records
+
+    def load_data_from_sqlite(self):
+        org_folder = self.login_manager._org_folder()
+        os.makedirs(org_folder, exist_ok=True)
+        self.backend = SQLiteStore(os.path.join(org_folder, SQLITE_FILE))
+        records = []
+        if self.backend.is_empty():
+            # הרצה ראשונה: ייבוא הנתונים הקיימים (data.json, הקבצים המפוצלים או גיטהאב)
+            # יחד עם השינויים מיומן ה-JSON שעוד לא קופלו אליהם
+            journal = ChangeJournal(org_folder)
+            data, records = self.replay_journal(self.login_manager.load_organization_data(), journal)
+            loaded = self.apply_data(data)
+            self.backend.save_snapshot(self.snapshot())
+            # השינויים במסד - היומן כבר לא בשימוש, והקבצים המפוצלים ייכתבו ברקע
+            journal.discard()
+            if records:
+                self.save_data()
+        else:
+            self.login_manager.resume_organization_data()
+            loaded = self.apply_data(self.backend.load())
+        self._local_changes = len(records)
+        return loaded
+
+    def apply_remote_data(self, data):
+        """
+        נקרא מתהליכון הסנכרון כשבגיטהאב יש גרסה חדשה יותר.
+        אם המשתמש כבר ערך משהו, העריכות המקומיות גוברות ויישמרו מעליה.
+        הבדיקה וההחלפה רצות תחת נעילת הנתונים, כמו פעולות המשתמש.
+        """
+        with self.page_updater.batch(), self.data_lock:
+            if self._local_changes:
+                return False
+            editing = self.current_edit_contact
+            applied = self.apply_data(data)
+            if applied and self.backend:
+                self.backend.save_snapshot(self.snapshot())
+            if applied and editing is not None:
+                # טופס העריכה הפתוח עובר לאיש הקשר מהנתונים החדשים
+                self.current_edit_contact = self.contacts_by_id.get(editing.id)
+                if self.current_edit_contact is None:
+                    self.clear_contact_fields()
+            return applied
+
+    def apply_data(self, data):
         if data:
             self.contacts = []
             self.events = []
             self.groups = []
+            schema_version = data.get("schema_version", 1)
 
-            # טעינת אנשי קשר
+            # טעינת אנשי קשר (בקובץ ישן אין מזהים - הם נוצרים כאן)
             for contact_data in data.get("contacts", []):
                 contact = Contact(**contact_data)
                 self.contacts.append(contact)
+            self.contacts_by_id = {contact.id: contact for contact in self.contacts}
+            self.rebuild_phone_index()
+            self.search_index.rebuild(self.contacts)
+            self.card_cache.clear()
+            self.mark_views_dirty(*ALL_VIEWS)
+
+            # אינדקס הפניה -> איש קשר, נבנה פעם אחת.
+            # בקבצים ישנים ההפניות הן לפי שם (הראשון בשם זהה גובר, כמו בחיפוש הליניארי)
+            contacts_by_ref = {}
+            for contact in self.contacts:
+                ref = contact.id if schema_version >= 2 else contact.name
+                contacts_by_ref.setdefault(ref, contact)
 
             # טעינת אירועים
             for event_data in data.get("events", []):
@@ -1498,32 +2321,49 @@ class AppManager:
                     event_data["title"],
                     event_data["date"],
                     event_data["time"],
-                    event_data["location"]
+                    event_data["location"],
+                    id=event_data.get("id")
                 )
                 # טעינת משתתפים מאושרים
-                for participant_name in event_data.get("participants", []):
-                    participant = next((c for c in self.contacts if c.name == participant_name), None)
+                for participant_ref in event_data.get("participants", []):
+                    participant = contacts_by_ref.get(participant_ref)
                     if participant:
                         event.participants.append(participant)
                 
                 # טעינת משתתפים ממתינים
-                for pending_name in event_data.get("pending_participants", []):
-                    pending = next((c for c in self.contacts if c.name == pending_name), None)
+                for pending_ref in event_data.get("pending_participants", []):
+                    pending = contacts_by_ref.get(pending_ref)
                     if pending:
                         event.pending_participants.append(pending)
+
+                for note_ref, note in event_data.get("pending_notes", {}).items():
+                    pending = contacts_by_ref.get(note_ref)
+                    if pending:
+                        event.pending_notes[pending] = note
                 
                 self.events.append(event)
 
             # טעינת קבוצות
             for group_data in data.get("groups", []):
-                group = Group(group_data["name"], group_data.get("description", ""))
-                for member_name in group_data.get("members", []):
-                    member = next((c for c in self.contacts if c.name == member_name), None)
+                group = Group(
+                    group_data["name"],
+                    group_data.get("description", ""),
+                    id=group_data.get("id")
+                )
+                for member_ref in group_data.get("members", []):
+                    member = contacts_by_ref.get(member_ref)
                     if member:
                         group.members.append(member)
                 self.groups.append(group)
 
+            self.membership.rebuild(self.contacts, self.events, self.groups)
             self.update_views()
+
+            # המרת קובץ ישן למבנה החדש - נשמרת מיד ובמלואה, לפני שנרשמים
+            # ליומן שינויים שמפנים למזהים החדשים
+            if schema_version < SCHEMA_VERSION:
+                self._full_save_pending = True
+                self.save_now()
             return True
         return False
 
@@ -1539,11 +2379,12 @@ class AppManager:
         )
 
         def add_participant(contact):
-            if contact not in event.participants:
-                event.participants.append(contact)
-                update_callback()
-                self.save_data()
-                self.show_message(f"{contact.name} נוסף לאירוע", ft.colors.GREEN)
+            with self.page_updater.batch(), self.data_lock:
+                if contact not in event.participants:
+                    self.add_event_participant(event, contact)
+                    update_callback()
+                    self.save_data()
+                    self.show_message(f"{contact.name} נוסף לאירוע", ft.colors.GREEN)
 
         # עדכון רשימת אנשי הקשר הזמינים
         for contact in self.contacts:
@@ -1591,4 +2432,5 @@ def main(page: ft.Page):
     app = AppManager()
     app.initialize_app(page)
 
-ft.app(target=main)
+if __name__ == "__main__":
+    ft.app(target=main)
@@ -0,0 +1,73 @@
+"""
+השוואת זיכרון לאיש קשר: המחלקה הישנה (עם __dict__) מול models.Contact.
+הנתונים נטענים מ-JSON כמו בטעינת האפליקציה, כך ששמות הקבוצות מגיעים כמחרוזות נפרדות.
+
+הרצה מתיקיית הפרויקט:
+    python benchmarks/contact_memory.py [מספר_אנשי_קשר]
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Contact
+from search_index import normalize_search_text, phone_digits
+
+GROUP_NAMES = ["משפחה", "עבודה", "חברים", "שכנים", "התנדבות"]
+
+
+class DictContact:
+    """ההגדרה הקודמת של איש קשר - מופע רגיל עם __dict__"""
+
+    def __init__(self, name, phone, email="", group="", id=None):
+        self.id = id
+        self.version = 0
+        self.name = name
+        self.phone = phone
+        self.email = email
+        self.group = group
+        self.search_name = normalize_search_text(self.name)
+        self.search_phone = phone_digits(self.phone)
+        self.search_email = normalize_search_text(self.email)
+
+
+def sample_json(count):
+    return json.dumps([
+        {
+            "id": f"{i:012x}",
+            "name": f"איש קשר {i}",
+            "phone": f"05{i:08d}",
+            "email": "",
+            "group": GROUP_NAMES[i % len(GROUP_NAMES)]
+        }
+        for i in range(count)
+    ], ensure_ascii=False)
+
+
+def measure(contact_class, raw):
+    gc.collect()
+    tracemalloc.start()
+    contacts = [contact_class(**data) for data in json.loads(raw)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(contacts)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    raw = sample_json(count)
+
+    before = measure(DictContact, raw)
+    after = measure(Contact, raw)
+
+    print(f"אנשי קשר: {count:,}")
+    print(f"לפני (__dict__):  {before:,.0f} בתים לאיש קשר")
+    print(f"אחרי (__slots__): {after:,.0f} בתים לאיש קשר")
+    print(f"חיסכון: {before - after:,.0f} בתים ({(1 - after / before) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+class CardCache:
+    """
+    מטמון כרטיסי תצוגה לכל ישות (איש קשר, אירוע, קבוצה).
+    כרטיס נשמר יחד עם מפתח - גרסת הישות ומצב הבחירה - ונבנה מחדש רק כשהמפתח משתנה.
+    """
+
+    def __init__(self):
+        self._cards = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entity, key, build):
+        cached = self._cards.get(entity)
+        if cached is not None and cached[0] == key:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        card = build()
+        self._cards[entity] = (key, card)
+        return card
+
+    def discard(self, entity):
+        self._cards.pop(entity, None)
+
+    def clear(self):
+        self._cards.clear()
+
+    def __len__(self):
+        return len(self._cards)
@@ -2,31 +2,14 @@ import flet as ft
 import json
 from datetime import datetime
 
+from search_index import SearchIndex
+from models import Contact, Event, Group, STATUS_CONFIRMED
+
 # משתנים גלובליים
 contacts = []
 events = []
 groups = []
-
-class Contact:
-    def __init__(self, name, phone, email="", group=""):
-        self.name = name
-        self.phone = phone
-        self.email = email
-        self.group = group
-
-class Event:
-    def __init__(self, title, date, time, location, participants=None):
-        self.title = title
-        self.date = date
-        self.time = time
-        self.location = location
-        self.participants = participants or []
-
-class Group:
-    def __init__(self, name, description=""):
-        self.name = name
-        self.description = description
-        self.members = []
+search_index = SearchIndex()
 
 def main(page: ft.Page):
     # הגדרות בסיסיות של הדף
@@ -94,6 +77,12 @@ def main(page: ft.Page):
                     contact_data.get("group", "")
                 )
                 contacts.append(contact)
+            search_index.rebuild(contacts)
+
+            # אינדקס שם -> איש קשר, נבנה פעם אחת (הראשון בשם זהה גובר, כמו בחיפוש הליניארי)
+            contacts_by_name = {}
+            for contact in contacts:
+                contacts_by_name.setdefault(contact.name, contact)
                 
             # טעינת אירועים
             events.clear()
@@ -106,7 +95,7 @@ def main(page: ft.Page):
                 )
                 # הוספת משתתפים לאירוע
                 for participant_name in event_data.get("participants", []):
-                    participant = next((c for c in contacts if c.name == participant_name), None)
+                    participant = contacts_by_name.get(participant_name)
                     if participant:
                         event.participants.append(participant)
                 events.append(event)
@@ -120,7 +109,7 @@ def main(page: ft.Page):
                 )
                 # הוספת חברים לקבוצה
                 for member_name in group_data.get("members", []):
-                    member = next((c for c in contacts if c.name == member_name), None)
+                    member = contacts_by_name.get(member_name)
                     if member:
                         group.members.append(member)
                 groups.append(group)
@@ -254,12 +243,7 @@ def main(page: ft.Page):
         if not search_text:
             contacts_list_view.controls = [create_contact_card(contact) for contact in contacts]
         else:
-            filtered = [
-                contact for contact in contacts
-                if search_text.lower() in contact.name.lower() or
-                   search_text in contact.phone or
-                   search_text.lower() in contact.email.lower()
-            ]
+            filtered = search_index.search(search_text)
             contacts_list_view.controls = [create_contact_card(contact) for contact in filtered]
         page.update()
 
@@ -275,6 +259,7 @@ def main(page: ft.Page):
 
     def delete_contact(contact):
         contacts.remove(contact)
+        search_index.remove(contact)
         filter_contacts("")
         update_participants_list()
         show_message("איש הקשר נמחק בהצלחה", ft.Colors.RED)
@@ -428,6 +413,8 @@ def main(page: ft.Page):
             current_edit_contact.phone = phone_field.value
             current_edit_contact.email = email_field.value
             current_edit_contact.group = group_field.value
+            current_edit_contact.refresh_search_keys()
+            search_index.update(current_edit_contact)
             contact = current_edit_contact
             show_message("איש הקשר עודכן בהצלחה", ft.Colors.GREEN)
             current_edit_contact = None
@@ -439,6 +426,7 @@ def main(page: ft.Page):
                 group_field.value
             )
             contacts.append(contact)
+            search_index.add(contact)
             show_message("איש הקשר נוסף בהצלחה", ft.Colors.GREEN)
 
         # הוספה לקבוצה החדשה
@@ -619,7 +607,7 @@ def main(page: ft.Page):
         
     def manage_event(event):
         # נוסיף מילון לשמירת סטטוס המשתתפים
-        participant_status = {p: "confirmed" for p in event.participants}
+        participant_status = {p: STATUS_CONFIRMED for p in event.participants}
         pending_participants = []  # רשימת ממתינים לאישור
 
         def close_event_tab(e):
@@ -643,7 +631,7 @@ def main(page: ft.Page):
             if contact in pending_participants:
                 pending_participants.remove(contact)
                 event.participants.append(contact)
-                participant_status[contact] = "confirmed"
+                participant_status[contact] = STATUS_CONFIRMED
                 update_event_participants()
                 save_data()
 
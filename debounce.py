@@ -0,0 +1,43 @@
+import threading
+
+
+class Debouncer:
+    """
+    מריץ את הקריאה האחרונה בלבד, אחרי פרק זמן שקט.
+    כל קריאה מקבלת מספר דור; הפונקציה יכולה לבדוק עם is_current
+    אם בינתיים הגיעה קריאה חדשה, ולזרוק תוצאה שכבר לא רלוונטית.
+    """
+
+    def __init__(self, callback, delay=0.25):
+        self.callback = callback
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer = None
+        self._generation = 0
+
+    def call(self, *args):
+        with self._lock:
+            self._generation += 1
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self._run, (self._generation, args))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self, generation, args):
+        if not self.is_current(generation):
+            return
+        try:
+            self.callback(generation, *args)
+        except Exception as e:
+            print(f"שגיאה בהרצה מושהית: {str(e)}")
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def cancel(self):
+        with self._lock:
+            self._generation += 1
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
@@ -0,0 +1,138 @@
+import os
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# טלפון ישראלי: 0 ואחריו 8-9 ספרות
+PHONE_PATTERN = r'^0\d{8,9}$'
+
+# גודל מנה בקריאה מוזרמת, ומספר השורות שלפיהן מזהים את עמודת הטלפון
+IMPORT_CHUNK_SIZE = 5000
+PHONE_SAMPLE_ROWS = 1000
+
+
+def clean_phones(column):
+    """מנקה עמודת טלפונים: מחרוזת, בלי רווחים בקצוות ובלי מקפים"""
+    return column.astype(str).str.strip().str.replace('-', '', regex=False)
+
+
+def unique_columns(names):
+    """
+    שמות עמודות ייחודיים, כמו ב-pd.read_excel: כותרת שחוזרת מקבלת סיומת
+    (x, x.1, x.2) - אחרת df[x] מחזיר טבלה ולא עמודה
+    """
+    counts = {}
+    result = []
+    for name in names:
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        counts[name] = count + 1
+        result.append(name)
+    return result
+
+
+def iter_contact_chunks(file_path, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    קורא קובץ אקסל או CSV במנות של chunk_size שורות, בלי לטעון את כולו לזיכרון.
+    השורה הראשונה היא שורת הכותרות.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+
+    if extension == ".csv":
+        # כל התאים נקראים כטקסט - אחרת 0501234567 הופך למספר ומאבד את האפס המוביל.
+        # רק תא ריק נחשב חסר, כדי ששם כמו "NA" לא ייפסל
+        yield from pd.read_csv(
+            file_path,
+            chunksize=chunk_size,
+            encoding="utf-8-sig",
+            dtype=str,
+            keep_default_na=False,
+            na_values=[""]
+        )
+        return
+
+    if extension != ".xlsx":
+        # פורמט xls הישן לא נתמך בקריאה מוזרמת - קריאה רגילה וחלוקה למנות
+        df = pd.read_excel(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+        return
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = unique_columns([
+            name if name is not None else f"עמודה {i + 1}"
+            for i, name in enumerate(header)
+        ])
+        width = len(columns)
+
+        batch = []
+        for row in rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+def detect_phone_column(df):
+    """מחזיר את העמודה שרוב ערכיה הם מספרי טלפון תקינים, או None"""
+    for column in df.columns:
+        valid_phones = clean_phones(df[column]).str.match(PHONE_PATTERN)
+        if valid_phones.mean() > 0.5:
+            return column
+    return None
+
+
+def prepare_contacts_frame(df, phone_column, existing_phones=()):
+    """
+    מעבד את הגיליון כולו בפעולות על עמודות:
+    חיבור השם, ניקוי ובדיקת הטלפון, סינון ערכים חסרים וכפילויות.
+    מחזיר טבלה עם העמודות name, phone של השורות שעברו, וסטטיסטיקה.
+    """
+    name_column = df.columns[0]
+    second_column = df.columns[1] if len(df.columns) > 1 else None
+
+    # העמודה הראשונה היא השם; השנייה מצטרפת אליו אם היא טקסט ולא מספר
+    names = df[name_column].astype(str).str.strip()
+    if second_column is not None:
+        second_values = df[second_column].astype(str).str.strip()
+        is_text = (
+            df[second_column].notna()
+            & (second_values != "")
+            & ~second_values.str.replace('-', '', regex=False).str.isdigit()
+        )
+        names = names.where(~is_text, names + " " + second_values)
+
+    phones = clean_phones(df[phone_column])
+
+    valid = (
+        df[name_column].notna()
+        & df[phone_column].notna()
+        & phones.str.match(PHONE_PATTERN)
+    )
+    frame = pd.DataFrame({"name": names[valid], "phone": phones[valid]})
+
+    # כפילויות בתוך המנה ומול אנשי הקשר הקיימים.
+    # הבדיקה מול existing_phones היא חיפוש במילון לכל שורה, כך שהעלות תלויה
+    # בגודל המנה ולא במספר אנשי הקשר הקיימים
+    already_known = frame["phone"].map(lambda phone: phone in existing_phones).astype(bool)
+    duplicated = frame["phone"].duplicated() | already_known
+    stats = {
+        "errors": int((~valid).sum()),
+        "duplicates": int(duplicated.sum())
+    }
+    return frame[~duplicated], stats
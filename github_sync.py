@@ -0,0 +1,67 @@
+import queue
+import threading
+
+
+class GitHubSyncWorker:
+    """
+    תהליכון רקע לסנכרון מול גיטהאב, עם תור חסום.
+    ממשק המשתמש רק מכניס משימות לתור ולא מחכה לרשת.
+    """
+
+    def __init__(self, maxsize=8):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.dropped_jobs = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="github-sync",
+                daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, job):
+        """
+        מכניס משימה לתור בלי לחסום.
+        אם התור מלא, המשימה הוותיקה ביותר נזרקת - כל שמירה היא תמונת מצב מלאה,
+        כך שהחדשה מחליפה אותה.
+        """
+        self.start()
+        while True:
+            try:
+                self._queue.put_nowait(job)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    self.dropped_jobs += 1
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                job()
+            except Exception as e:
+                print(f"שגיאה בסנכרון ברקע: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def stop(self, timeout=30):
+        """מסיים את המשימות שבתור ועוצר את התהליכון"""
+        if not self._thread or not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
@@ -0,0 +1,53 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+GITHUB_API_URL = "https://api.github.com"
+
+# זמני המתנה בשניות: (התחברות, קריאה)
+GITHUB_TIMEOUT = (5, 30)
+GITHUB_POOL_SIZE = 8
+
+
+class GitHubRetry(Retry):
+    """
+    מדיניות ניסיונות חוזרים לגיטהאב: שגיאות 5xx, וגם 403/429 כשמדובר
+    בהגבלת קצב משנית (התשובה מגיעה עם Retry-After)
+    """
+    RETRY_AFTER_STATUS_CODES = frozenset([403, 413, 429, 503])
+
+
+def github_retry():
+    """לחיבור requests הישיר בלבד; לקוח PyGithub משתמש ב-GithubRetry שלו"""
+    return GitHubRetry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+
+
+class GitHubSession(requests.Session):
+    """
+    חיבור HTTP משותף לגיטהאב: keep-alive, מאגר חיבורים, זמני המתנה
+    וניסיונות חוזרים עם השהיה הולכת וגדלה
+    """
+
+    def __init__(self, token, timeout=GITHUB_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        self.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github.v3+json"
+        })
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=GITHUB_POOL_SIZE,
+            max_retries=github_retry()
+        )
+        self.mount("https://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
@@ -0,0 +1,189 @@
+import json
+import os
+import threading
+
+JOURNAL_FILE = "journal.log"
+# היומן שהוקפא לקראת שמירה מלאה; נמחק כשהשמירה הצליחה
+ROTATED_FILE = "journal.log.1"
+# מעבר לגודל הזה היומן מקופל לתמונת מצב מלאה
+COMPACT_THRESHOLD = 256 * 1024
+
+
+class ChangeJournal:
+    """
+    יומן שינויים מקומי (write-ahead): כל שינוי נרשם כשורת JSON קצרה ונכתב לדיסק
+    מיד. בשמירה מלאה היומן מוקפא (rotate) ונמחק רק אחרי שתמונת המצב נכתבה,
+    כך שאחרי קריסה - גם באמצע שמירה - הטעינה משחזרת את השינויים מהיומן.
+    """
+
+    def __init__(self, folder, compact_threshold=COMPACT_THRESHOLD):
+        self.folder = folder
+        self.compact_threshold = compact_threshold
+        self.path = os.path.join(folder, JOURNAL_FILE)
+        self.rotated_path = os.path.join(folder, ROTATED_FILE)
+        self._lock = threading.Lock()
+
+    def append(self, op, **fields):
+        self.append_many([dict(fields, op=op)])
+
+    def append_many(self, records):
+        """רושם כמה שינויים בכתיבה אחת ו-fsync אחד (למשל בייבוא)"""
+        if not records:
+            return
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with self._lock:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def needs_compaction(self):
+        return self.size() > self.compact_threshold
+
+    def rotate(self):
+        """
+        מקפיא את היומן הנוכחי לפני בניית תמונת מצב. שינויים מכאן והלאה
+        נכתבים ליומן חדש. אם שמירה קודמת נכשלה, היומן מצורף לזה שכבר הוקפא.
+        """
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            if os.path.exists(self.rotated_path):
+                with open(self.path, 'r', encoding='utf-8') as source, \
+                        open(self.rotated_path, 'a', encoding='utf-8') as target:
+                    target.write(source.read())
+                    target.flush()
+                    os.fsync(target.fileno())
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+
+    def discard_rotated(self):
+        """נקרא אחרי שתמונת המצב נכתבה - השינויים שהוקפאו כבר כלולים בה"""
+        with self._lock:
+            try:
+                os.remove(self.rotated_path)
+            except FileNotFoundError:
+                pass
+
+    def discard(self):
+        """מוחק את כל היומן, כולל מה שהוקפא"""
+        with self._lock:
+            for path in (self.rotated_path, self.path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def records(self):
+        """כל השינויים שעדיין לא נכללו בתמונת מצב, לפי הסדר"""
+        records = []
+        with self._lock:
+            for path in (self.rotated_path, self.path):
+                try:
+                    with open(path, 'rb+') as f:
+                        content = f.read()
+                        if content and not content.endswith(b"\n"):
+                            # שורה אחרונה שנקטעה בקריסה - השינוי הזה לא הושלם,
+                            # והיא נחתכת כדי שהרישום הבא יתחיל בשורה נקייה
+                            content = content[:content.rfind(b"\n") + 1]
+                            f.truncate(len(content))
+                except FileNotFoundError:
+                    continue
+                records.extend(json.loads(line) for line in content.decode('utf-8').splitlines())
+        return records
+
+
+def _by_id(items):
+    return {item["id"]: item for item in items}
+
+
+def _discard(values, value):
+    if value in values:
+        values.remove(value)
+
+
+def replay(data, records):
+    """
+    מחיל את רשומות היומן על מבנה הנתונים (לפי מזהים).
+    כל רשומה מגדירה מצב סופי, כך שהחלה כפולה של אותה רשומה לא משנה את התוצאה.
+    """
+    contacts = _by_id(data.setdefault("contacts", []))
+    events = _by_id(data.setdefault("events", []))
+    groups = _by_id(data.setdefault("groups", []))
+
+    def put(collection, index, item, defaults=None):
+        existing = index.get(item["id"])
+        if existing is None:
+            item = dict(defaults or {}, **item)
+            collection.append(item)
+            index[item["id"]] = item
+        else:
+            existing.update(item)
+
+    def delete(collection, index, item_id):
+        item = index.pop(item_id, None)
+        if item is not None:
+            collection.remove(item)
+
+    for record in records:
+        op = record.get("op")
+
+        if op == "contact_put":
+            put(data["contacts"], contacts, record["contact"])
+        elif op == "contact_del":
+            delete(data["contacts"], contacts, record["id"])
+            for group in groups.values():
+                _discard(group.setdefault("members", []), record["id"])
+            for event in events.values():
+                _discard(event.setdefault("participants", []), record["id"])
+                _discard(event.setdefault("pending_participants", []), record["id"])
+                event.setdefault("pending_notes", {}).pop(record["id"], None)
+
+        elif op == "group_put":
+            put(data["groups"], groups, record["group"], {"members": []})
+        elif op == "group_del":
+            delete(data["groups"], groups, record["id"])
+        elif op == "member_add":
+            group = groups.get(record["group"])
+            if group is not None and record["contact"] not in group.setdefault("members", []):
+                group["members"].append(record["contact"])
+        elif op == "member_del":
+            group = groups.get(record["group"])
+            if group is not None:
+                _discard(group.setdefault("members", []), record["contact"])
+
+        elif op == "event_put":
+            put(data["events"], events, record["event"], {"participants": [], "pending_participants": []})
+        elif op == "event_del":
+            delete(data["events"], events, record["id"])
+        elif op in ("participant_set", "participant_del"):
+            event = events.get(record["event"])
+            if event is None:
+                continue
+            contact_id = record["contact"]
+            participants = event.setdefault("participants", [])
+            pending = event.setdefault("pending_participants", [])
+            notes = event.setdefault("pending_notes", {})
+            if op == "participant_set":
+                target, other = (pending, participants) if record.get("pending") else (participants, pending)
+                _discard(other, contact_id)
+                if contact_id not in target:
+                    target.append(contact_id)
+                if record.get("note"):
+                    notes[contact_id] = record["note"]
+                else:
+                    notes.pop(contact_id, None)
+            else:
+                _discard(participants, contact_id)
+                _discard(pending, contact_id)
+                notes.pop(contact_id, None)
+
+    return data
@@ -2,16 +2,21 @@ import flet as ft
 import json
 import os
 import requests
-from github import Github
+from github import Github, GithubRetry
 from datetime import datetime
 import base64
 
+from http_client import GITHUB_TIMEOUT, GITHUB_POOL_SIZE
+
 class LoginManager:
     def __init__(self):
         self.github_token = "YOUR_GITHUB_TOKEN"  # יש להחליף בטוקן אמיתי של GitHub
         self.repo_name = "DARTYQO/people"
         self.data_folder = "DATA"
         self.current_user = None
+        # לקוח גיטהאב אחד משותף (keep-alive, זמני המתנה וניסיונות חוזרים)
+        self._github = None
+        self._repo = None
         
     def create_login_page(self, page: ft.Page, on_login_success):
         page.title = "התחברות למערכת"
@@ -156,10 +161,21 @@ class LoginManager:
         page.controls = [register_form]
         page.update()
         
+    def _get_repo(self):
+        if self._repo is None:
+            # GithubRetry של PyGithub מטפל בעצמו בהגבלת קצב משנית וב-Retry-After
+            self._github = Github(
+                self.github_token,
+                timeout=GITHUB_TIMEOUT[1],
+                retry=GithubRetry(),
+                pool_size=GITHUB_POOL_SIZE
+            )
+            self._repo = self._github.get_repo(self.repo_name)
+        return self._repo
+
     def validate_user(self, username, password):
         try:
-            g = Github(self.github_token)
-            repo = g.get_repo(self.repo_name)
+            repo = self._get_repo()
             users_file = repo.get_contents(f"{self.data_folder}/users.json")
             users_data = json.loads(base64.b64decode(users_file.content).decode())
             
@@ -171,8 +187,7 @@ class LoginManager:
             
     def register_user(self, username, password):
         try:
-            g = Github(self.github_token)
-            repo = g.get_repo(self.repo_name)
+            repo = self._get_repo()
             
             try:
                 users_file = repo.get_contents(f"{self.data_folder}/users.json")
@@ -222,8 +237,7 @@ class LoginManager:
             return None
             
         try:
-            g = Github(self.github_token)
-            repo = g.get_repo(self.repo_name)
+            repo = self._get_repo()
             data_file = repo.get_contents(f"{self.data_folder}/{self.current_user}/data.json")
             return json.loads(base64.b64decode(data_file.content).decode())
         except:
@@ -234,8 +248,7 @@ class LoginManager:
             return False
             
         try:
-            g = Github(self.github_token)
-            repo = g.get_repo(self.repo_name)
+            repo = self._get_repo()
             data_file = repo.get_contents(f"{self.data_folder}/{self.current_user}/data.json")
             
             repo.update_file(
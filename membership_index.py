@@ -0,0 +1,80 @@
+from collections import defaultdict
+
+
+class MembershipIndex:
+    """
+    אינדקס הפוך: מאיש קשר לקבוצות ולאירועים שהוא חבר בהם,
+    ומשם קבוצה (השדה group של איש הקשר) לאנשי הקשר שמסומנים בו.
+    מאפשר מחיקה ושינוי שם בעלות שתלויה רק במספר הקשרים, בלי לסרוק הכל.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._groups = defaultdict(dict)
+        self._events = defaultdict(dict)
+        self._labels = defaultdict(dict)
+
+    @staticmethod
+    def _unlink(index, key, value):
+        values = index.get(key)
+        if values is not None:
+            values.pop(value, None)
+            if not values:
+                del index[key]
+
+    def link_group(self, contact, group):
+        self._groups[contact][group] = None
+
+    def unlink_group(self, contact, group):
+        self._unlink(self._groups, contact, group)
+
+    def link_event(self, contact, event):
+        self._events[contact][event] = None
+
+    def unlink_event(self, contact, event):
+        self._unlink(self._events, contact, event)
+
+    def relabel(self, contact, old_name, new_name):
+        """נקרא כששדה הקבוצה של איש הקשר משתנה"""
+        if old_name:
+            self._unlink(self._labels, old_name, contact)
+        if new_name:
+            self._labels[new_name][contact] = None
+
+    def groups_of(self, contact):
+        return list(self._groups.get(contact, ()))
+
+    def events_of(self, contact):
+        return list(self._events.get(contact, ()))
+
+    def contacts_labeled(self, group_name):
+        return list(self._labels.get(group_name, ()))
+
+    def forget_contact(self, contact):
+        self._groups.pop(contact, None)
+        self._events.pop(contact, None)
+        if contact.group:
+            self._unlink(self._labels, contact.group, contact)
+
+    def forget_group(self, group):
+        for contact in group.members:
+            self.unlink_group(contact, group)
+
+    def forget_event(self, event):
+        for contact in list(event.participants) + list(event.pending_participants):
+            self.unlink_event(contact, event)
+
+    def rebuild(self, contacts, events, groups):
+        self.clear()
+        for contact in contacts:
+            self.relabel(contact, None, contact.group)
+        for group in groups:
+            for contact in group.members:
+                self.link_group(contact, group)
+        for event in events:
+            for contact in event.participants:
+                self.link_event(contact, event)
+            for contact in event.pending_participants:
+                self.link_event(contact, event)
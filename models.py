@@ -0,0 +1,139 @@
+import re
+import sys
+import uuid
+
+from search_index import normalize_search_text, phone_digits
+
+# מצבי משתתף באירוע - מחרוזות משותפות לכל המשתתפים
+STATUS_CONFIRMED = sys.intern("confirmed")
+STATUS_PENDING = sys.intern("pending")
+
+
+def new_id():
+    """מזהה קצר וקבוע לישות - לא משתנה גם כשהשם משתנה"""
+    return uuid.uuid4().hex[:12]
+
+
+def normalize_phone(phone):
+    """מספר טלפון בצורה אחידה לזיהוי כפילויות: ספרות בלבד, קידומת 972 הופכת ל-0"""
+    digits = re.sub(r'\D', '', str(phone or ""))
+    if digits.startswith("972"):
+        digits = "0" + digits[3:]
+    return digits
+
+
+def intern_name(name):
+    """שמות קבוצות חוזרים אצל אלפי אנשי קשר - עותק אחד בזיכרון לכל שם"""
+    return sys.intern(name) if isinstance(name, str) else name
+
+
+class MemberSet:
+    """
+    קבוצה סדורה של אנשי קשר (משתתפים / חברי קבוצה): בדיקת שייכות ב-O(1)
+    ושמירה על סדר ההוספה לתצוגה. הממשק תואם לרשימה - append, remove, in, len.
+    """
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+
+    def append(self, item):
+        self._items[item] = None
+
+    add = append
+
+    def remove(self, item):
+        del self._items[item]
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"MemberSet({list(self._items)!r})"
+
+
+# המחלקות מוגדרות עם __slots__ - בלי __dict__ לכל מופע
+class Contact:
+    __slots__ = (
+        "id", "version", "name", "phone", "email", "_group",
+        "search_name", "search_phone", "search_email"
+    )
+
+    def __init__(self, name, phone, email="", group="", id=None):
+        self.id = id or new_id()
+        self.version = 0
+        self.name = name
+        self.phone = phone
+        self.email = email
+        self.group = group
+        self.refresh_search_keys()
+
+    @property
+    def group(self):
+        return self._group
+
+    @group.setter
+    def group(self, value):
+        self._group = intern_name(value)
+
+    def touch(self):
+        """מסמן שהישות השתנתה - הכרטיס שלה ייבנה מחדש"""
+        self.version += 1
+
+    def refresh_search_keys(self):
+        """מחשב מחדש את מפתחות החיפוש המנורמלים - נקרא אחרי כל שינוי בפרטים"""
+        self.search_name = normalize_search_text(self.name)
+        self.search_phone = phone_digits(self.phone)
+        self.search_email = normalize_search_text(self.email)
+
+
+class Event:
+    __slots__ = (
+        "id", "version", "title", "date", "time", "location",
+        "participants", "pending_participants", "pending_notes"
+    )
+
+    def __init__(self, title, date, time, location, participants=None, id=None):
+        self.id = id or new_id()
+        self.version = 0
+        self.title = title
+        self.date = date
+        self.time = time
+        self.location = location
+        self.participants = MemberSet(participants or ())
+        self.pending_participants = MemberSet()
+        self.pending_notes = {}
+
+    def touch(self):
+        self.version += 1
+
+
+class Group:
+    __slots__ = ("id", "version", "_name", "description", "members")
+
+    def __init__(self, name, description="", id=None):
+        self.id = id or new_id()
+        self.version = 0
+        self.name = name
+        self.description = description
+        self.members = MemberSet()
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        self._name = intern_name(value)
+
+    def touch(self):
+        self.version += 1
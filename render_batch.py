@@ -0,0 +1,79 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+
+class PageUpdater:
+    """
+    מאחד קריאות עדכון של הדף: בתוך batch() רק מסמנים שיש מה לשלוח,
+    ועדכון אחד נשלח ללקוח כשהפעולה מסתיימת.
+    מחוץ ל-batch (למשל מתהליכוני רקע) העדכון נשלח מיד.
+    """
+
+    def __init__(self, page=None):
+        self.page = page
+        self._local = threading.local()
+        self._count_lock = threading.Lock()
+        # מספר העדכונים שנשלחו בפועל ללקוח
+        self.update_count = 0
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "depth"):
+            local.depth = 0
+            local.page_dirty = False
+            local.controls = []
+        return local
+
+    @contextmanager
+    def batch(self):
+        state = self._state()
+        state.depth += 1
+        try:
+            yield self
+        finally:
+            state.depth -= 1
+            if state.depth == 0:
+                self.flush()
+
+    def request_update(self, *controls):
+        """
+        מבקש לעדכן את הדף כולו, או רק את הרכיבים שהועברו.
+        רכיב שעוד לא נוסף לדף יישלח עם העדכון הכללי הבא.
+        """
+        state = self._state()
+        if controls:
+            state.controls.extend(control for control in controls if control.page)
+        else:
+            state.page_dirty = True
+        if state.depth == 0:
+            self.flush()
+
+    def flush(self):
+        state = self._state()
+        page_dirty, controls = state.page_dirty, state.controls
+        state.page_dirty = False
+        state.controls = []
+        if not self.page or not (page_dirty or controls):
+            return
+
+        if page_dirty:
+            self.page.update()
+        else:
+            # כל הרכיבים שהשתנו נשלחים בהודעה אחת
+            unique_controls = {id(control): control for control in controls}
+            self.page.update(*unique_controls.values())
+        with self._count_lock:
+            self.update_count += 1
+
+
+def batched_render(method):
+    """
+    מריץ מתודה של AppManager בתוך batch - עדכון אחד של הדף בסוף הפעולה.
+    המתודה רצה תחת data_lock, כך שתהליכוני רקע לא קוראים או משנים את הנתונים באמצעה
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.page_updater.batch(), self.data_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,92 @@
+import threading
+import time
+
+
+class SaveQueue:
+    """
+    תור שמירה מושהה (write-behind): מסמן את הארגון כ"מלוכלך" וממזג רצף של
+    עריכות לשמירה אחת, אחרי זמן שקט או לכל המאוחר אחרי השהיה מקסימלית.
+    פונקציית השמירה מדווחת על כישלון בחריגה - והשמירה מתוזמנת שוב.
+    """
+
+    def __init__(self, flush_callback, quiet_period=1.0, max_delay=5.0):
+        self.flush_callback = flush_callback
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._first_dirty_at = None
+
+        # מונים לסטטיסטיקה
+        self.requested_writes = 0
+        self.merged_writes = 0
+        self.flush_count = 0
+
+    def mark_dirty(self):
+        """מסמן שיש שינויים שממתינים לשמירה ומתזמן שמירה"""
+        with self._lock:
+            self.requested_writes += 1
+            if self._dirty:
+                # כבר ממתינה שמירה - הבקשה הנוכחית ממוזגת אליה
+                self.merged_writes += 1
+            self._schedule()
+
+    def _schedule(self):
+        """מתזמן שמירה (נקרא תחת הנעילה)"""
+        now = time.monotonic()
+        if not self._dirty:
+            self._dirty = True
+            self._first_dirty_at = now
+
+        # לא לחכות יותר מההשהיה המקסימלית מהשינוי הראשון
+        deadline = self._first_dirty_at + self.max_delay
+        delay = max(0.0, min(self.quiet_period, deadline - now))
+
+        if self._timer:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self):
+        """מבצע את השמירה מיד אם יש שינויים ממתינים"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            self._dirty = False
+            self._first_dirty_at = None
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+
+        # השמירה עצמה מחוץ לנעילה, כדי שעריכות חדשות לא ייחסמו בזמן הכתיבה
+        with self._flush_lock:
+            try:
+                self.flush_callback()
+                saved = True
+            except Exception as e:
+                print(f"שגיאה בשמירה המושהית: {str(e)}")
+                saved = False
+            self.flush_count += 1
+
+        if not saved:
+            # השינויים עדיין לא נשמרו - ניסיון נוסף בעוד זמן השקט
+            with self._lock:
+                self._schedule()
+        return saved
+
+    def is_dirty(self):
+        with self._lock:
+            return self._dirty
+
+    def stats(self):
+        """מחזיר את מוני התור"""
+        return {
+            "requested_writes": self.requested_writes,
+            "merged_writes": self.merged_writes,
+            "flushes": self.flush_count,
+            "pending": self.is_dirty()
+        }
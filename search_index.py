@@ -0,0 +1,133 @@
+import re
+import unicodedata
+from collections import defaultdict
+
+# אורך רצף התווים באינדקס
+NGRAM_SIZE = 3
+
+# שאילתה שנראית כמו מספר טלפון: ספרות, מקפים, רווחים ו-+
+PHONE_QUERY_PATTERN = re.compile(r'^[\d\-\s+()]+$')
+
+
+# אותיות סופיות מקופלות לצורה הרגילה: ך->כ, ם->מ, ן->נ, ף->פ, ץ->צ
+FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+
+# מקף עברי (מקף עליון) וסוגי מקפים אחרים הופכים למקף רגיל
+DASHES = str.maketrans({
+    "\u05be": "-",
+    "\u2010": "-",
+    "\u2011": "-",
+    "\u2012": "-",
+    "\u2013": "-",
+    "\u2014": "-"
+})
+
+
+def normalize_search_text(text):
+    """
+    מפתח חיפוש: casefold, בלי ניקוד וטעמים, אותיות סופיות מקופלות ומקפים אחידים
+    """
+    text = unicodedata.normalize("NFKD", str(text or "")).casefold()
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.translate(FINAL_LETTERS).translate(DASHES)
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def phone_digits(phone):
+    return re.sub(r'\D', '', str(phone or ""))
+
+
+class SearchIndex:
+    """
+    אינדקס הפוך (n-gram) על שם, ספרות הטלפון והאימייל של אנשי הקשר.
+    חיפוש תת-מחרוזת נענה מחיתוך רשימות ההופעה ואז אימות של המועמדים בלבד.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(set)
+        # המפתחות שלפיהם כל איש קשר נוסף לאינדקס, כדי שאפשר יהיה להסיר אותו
+        self._keys = {}
+        # סדר ההוספה - התוצאות מוחזרות לפי הסדר המקורי של הרשימה
+        self._order = {}
+        self._next_order = 0
+
+    @staticmethod
+    def contact_keys(contact):
+        # המפתחות המנורמלים מחושבים על איש הקשר עצמו בזמן יצירה, עריכה וטעינה
+        return (contact.search_name, contact.search_phone, contact.search_email)
+
+    def add(self, contact, order=None):
+        keys = self.contact_keys(contact)
+        self._keys[contact] = keys
+        if order is None:
+            order = self._next_order
+            self._next_order += 1
+        self._order[contact] = order
+        for key in keys:
+            for gram in ngrams(key):
+                self._postings[gram].add(contact)
+
+    def remove(self, contact):
+        keys = self._keys.pop(contact, None)
+        if keys is None:
+            return None
+        for key in keys:
+            for gram in ngrams(key):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(contact)
+                    if not posting:
+                        del self._postings[gram]
+        return self._order.pop(contact, None)
+
+    def update(self, contact):
+        """מעדכן איש קשר שנערך, ושומר על מקומו בסדר"""
+        order = self.remove(contact)
+        self.add(contact, order)
+
+    def rebuild(self, contacts):
+        self._postings = defaultdict(set)
+        self._keys = {}
+        self._order = {}
+        self._next_order = 0
+        for contact in contacts:
+            self.add(contact)
+
+    def _candidates(self, text):
+        """חיתוך רשימות ההופעה של כל ה-n-grams בטקסט, מהקצרה לארוכה"""
+        postings = [self._postings.get(gram) for gram in ngrams(text)]
+        if not all(postings):
+            return set()
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def search(self, query):
+        """מחזיר את אנשי הקשר שהשם, הטלפון או האימייל שלהם מכילים את השאילתה"""
+        text = normalize_search_text(query)
+        digits = phone_digits(query) if PHONE_QUERY_PATTERN.match(query) else ""
+
+        if len(text) < NGRAM_SIZE or 0 < len(digits) < NGRAM_SIZE:
+            # שאילתה (או חלק הטלפון שלה) קצרה מדי לאינדקס - בדיקה ישירה של המפתחות
+            candidates = self._keys.keys()
+        else:
+            candidates = set()
+            if len(text) >= NGRAM_SIZE:
+                candidates |= self._candidates(text)
+            if len(digits) >= NGRAM_SIZE:
+                candidates |= self._candidates(digits)
+
+        matches = []
+        for contact in candidates:
+            name, phone, email = self._keys[contact]
+            if text in name or text in email or (digits and digits in phone):
+                matches.append(contact)
+        matches.sort(key=self._order.__getitem__)
+        return matches
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# מספר קבצי אנשי הקשר - כל איש קשר נכנס לקובץ לפי גיבוב המזהה שלו
+CONTACT_SHARDS = 16
+MANIFEST_FILE = "manifest.json"
+EVENTS_FILE = "events.json"
+GROUPS_FILE = "groups.json"
+# סדר אנשי הקשר ברשימה - מזהים בלבד, משתנה רק בהוספה ובמחיקה
+ORDER_FILE = "contacts/order.json"
+# הקובץ הישן - כל הנתונים בקובץ אחד
+LEGACY_FILE = "data.json"
+LOAD_WORKERS = 8
+
+
+def contact_shard_path(contact_id, shard_count=CONTACT_SHARDS):
+    return f"contacts/{zlib.crc32(contact_id.encode('utf-8')) % shard_count:02d}.json"
+
+
+def serialize(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def digest(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def split_data(data, shard_count=CONTACT_SHARDS):
+    """מפצל את מבנה הנתונים המלא לקבצים: {נתיב יחסי: טקסט}"""
+    contact_shards = {
+        f"contacts/{index:02d}.json": [] for index in range(shard_count)
+    }
+    for contact in data.get("contacts", []):
+        contact_shards[contact_shard_path(contact["id"], shard_count)].append(contact)
+
+    shards = {path: serialize(contacts) for path, contacts in contact_shards.items()}
+    shards[ORDER_FILE] = serialize([contact["id"] for contact in data.get("contacts", [])])
+    shards[EVENTS_FILE] = serialize(data.get("events", []))
+    shards[GROUPS_FILE] = serialize(data.get("groups", []))
+    return shards
+
+
+def record_shards(record, shard_count=CONTACT_SHARDS):
+    """
+    הקבצים שרשומת שינוי (מיומן השינויים) משנה. איש קשר חדש (מסומן ב-"new")
+    או שנמחק משנה גם את קובץ הסדר; מחיקה מסירה אותו גם מהקבוצות והאירועים
+    """
+    op = record.get("op")
+    if op == "contact_put":
+        paths = {contact_shard_path(record["contact"]["id"], shard_count)}
+        if record.get("new"):
+            paths.add(ORDER_FILE)
+        return paths
+    if op == "contact_del":
+        return {contact_shard_path(record["id"], shard_count), ORDER_FILE, GROUPS_FILE, EVENTS_FILE}
+    if op in ("group_put", "group_del", "member_add", "member_del"):
+        return {GROUPS_FILE}
+    if op in ("event_put", "event_del", "participant_set", "participant_del"):
+        return {EVENTS_FILE}
+    return set()
+
+
+def build_manifest(data, shards, shard_count=CONTACT_SHARDS):
+    """קובץ המפתח: גרסת המבנה ותקציר לכל קובץ - משתנה בכל שינוי באחד הקבצים"""
+    return serialize({
+        "schema_version": data.get("schema_version"),
+        "contact_shards": shard_count,
+        "shards": {path: digest(text) for path, text in sorted(shards.items())}
+    })
+
+
+def join_data(manifest, shards):
+    """מרכיב את מבנה הנתונים המלא מקובץ המפתח ומתוכן הקבצים"""
+    contacts = []
+    for path in sorted(manifest["shards"]):
+        if path.startswith("contacts/") and path != ORDER_FILE:
+            contacts.extend(json.loads(shards[path]))
+    if ORDER_FILE in shards:
+        order = {contact_id: index for index, contact_id in enumerate(json.loads(shards[ORDER_FILE]))}
+        contacts.sort(key=lambda contact: order.get(contact["id"], len(order)))
+    return {
+        "schema_version": manifest.get("schema_version"),
+        "contacts": contacts,
+        "events": json.loads(shards.get(EVENTS_FILE, "[]")),
+        "groups": json.loads(shards.get(GROUPS_FILE, "[]"))
+    }
+
+
+class ShardedStorage:
+    """
+    שמירת נתוני הארגון בקבצים נפרדים: אנשי קשר מחולקים לפי גיבוב המזהה,
+    ואירועים וקבוצות בקובץ משלהם. בשמירה נכתבים רק קבצים שהתוכן שלהם השתנה,
+    כך שעדכון אישור הגעה אחד כותב את events.json וקובץ המפתח בלבד.
+    אחרי שנכתב קובץ המפתח, data.json הישן נמחק - הוא כבר לא מתעדכן.
+    """
+
+    def __init__(self, folder, shard_count=CONTACT_SHARDS):
+        self.folder = folder
+        self.shard_count = shard_count
+        self._lock = threading.Lock()
+        # התקציר של כל קובץ כפי שהוא כרגע על הדיסק
+        self.digests = {}
+
+    def _path(self, relative_path):
+        return os.path.join(self.folder, *relative_path.split("/"))
+
+    def read(self, relative_path):
+        with open(self._path(relative_path), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def _write(self, relative_path, text):
+        """כתיבה לקובץ זמני והחלפה - קובץ לא נשאר חצי כתוב"""
+        path = self._path(relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def load(self):
+        """טוען את כל הקבצים במקביל. אם עדיין אין קובץ מפתח - נטען data.json הישן"""
+        try:
+            manifest_text = self.read(MANIFEST_FILE)
+        except FileNotFoundError:
+            return self._load_legacy()
+
+        manifest = json.loads(manifest_text)
+        paths = list(manifest["shards"])
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+            shards = dict(zip(paths, executor.map(self.read, paths)))
+
+        with self._lock:
+            self.digests = {path: digest(text) for path, text in shards.items()}
+            self.digests[MANIFEST_FILE] = digest(manifest_text)
+        return join_data(manifest, shards)
+
+    def load_digests(self):
+        """
+        קורא רק את קובץ המפתח, כשהנתונים עצמם נטענים ממקום אחר (SQLite),
+        כדי שהשמירה הבאה תכתוב רק את מה שהשתנה
+        """
+        try:
+            manifest_text = self.read(MANIFEST_FILE)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self.digests = dict(json.loads(manifest_text)["shards"])
+            self.digests[MANIFEST_FILE] = digest(manifest_text)
+
+    def _load_legacy(self):
+        try:
+            with open(self._path(LEGACY_FILE), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            # השמירה הראשונה תכתוב את כל הקבצים במבנה החדש
+            self.digests = {}
+        return data
+
+    def remote_manifest(self, manifest_text):
+        """הקבצים שהתוכן שלהם בקובץ מפתח (מרוחק) שונה ממה שיש על הדיסק"""
+        manifest = json.loads(manifest_text)
+        with self._lock:
+            changed = [
+                path for path, shard_digest in manifest["shards"].items()
+                if self.digests.get(path) != shard_digest
+            ]
+        return manifest, changed
+
+    def has_manifest(self):
+        """האם יש כבר על הדיסק קבצים במבנה המפוצל (ולא רק data.json הישן)"""
+        with self._lock:
+            return MANIFEST_FILE in self.digests
+
+    def save_shards(self, shards, schema_version):
+        """
+        כותב רק את הקבצים שהועברו (מי שקורא יודע מה השתנה) ומעדכן את קובץ
+        המפתח לפי התקצירים הקיימים. מחזיר את מה שנכתב, כמו save.
+        """
+        with self._lock:
+            changed = {
+                path: text for path, text in shards.items()
+                if self.digests.get(path) != digest(text)
+            }
+            if not changed:
+                return {}
+            for path, text in changed.items():
+                self._write(path, text)
+                self.digests[path] = digest(text)
+
+            changed[MANIFEST_FILE] = serialize({
+                "schema_version": schema_version,
+                "contact_shards": self.shard_count,
+                "shards": {
+                    path: shard_digest for path, shard_digest in sorted(self.digests.items())
+                    if path != MANIFEST_FILE
+                }
+            })
+            self._write(MANIFEST_FILE, changed[MANIFEST_FILE])
+            self.digests[MANIFEST_FILE] = digest(changed[MANIFEST_FILE])
+            if self._remove_legacy():
+                changed[LEGACY_FILE] = None
+        return changed
+
+    def _remove_legacy(self):
+        """מוחק את data.json הישן, אם עדיין קיים. מחזיר האם נמחק"""
+        try:
+            os.remove(self._path(LEGACY_FILE))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def save(self, data):
+        """
+        שמירה מלאה (הרצה ראשונה, המרה או נתונים מגיטהאב): כותב רק את הקבצים
+        שהשתנו ומחזיר אותם: {נתיב יחסי: טקסט}. קובץ המפתח נכתב אחרון.
+        data.json ישן שנמחק מוחזר עם הערך None.
+        """
+        shards = split_data(data, self.shard_count)
+        shards[MANIFEST_FILE] = build_manifest(data, shards, self.shard_count)
+
+        with self._lock:
+            changed = {
+                path: text for path, text in shards.items()
+                if self.digests.get(path) != digest(text)
+            }
+            for path in sorted(changed, key=lambda p: p == MANIFEST_FILE):
+                self._write(path, changed[path])
+                self.digests[path] = digest(changed[path])
+            if self._remove_legacy():
+                changed[LEGACY_FILE] = None
+        return changed
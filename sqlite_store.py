@@ -0,0 +1,405 @@
+import sqlite3
+import threading
+
+from models import normalize_phone
+from sharded_storage import contact_shard_path, serialize, ORDER_FILE, EVENTS_FILE, GROUPS_FILE
+from search_index import normalize_search_text, phone_digits, PHONE_QUERY_PATTERN
+
+SQLITE_FILE = "people.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS contacts (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    email TEXT NOT NULL DEFAULT '',
+    grp TEXT NOT NULL DEFAULT '',
+    phone_norm TEXT NOT NULL,
+    search_name TEXT NOT NULL,
+    search_phone TEXT NOT NULL,
+    search_email TEXT NOT NULL,
+    shard TEXT
+);
+CREATE INDEX IF NOT EXISTS contacts_position ON contacts(position);
+CREATE INDEX IF NOT EXISTS contacts_phone_norm ON contacts(phone_norm);
+CREATE INDEX IF NOT EXISTS contacts_search_name ON contacts(search_name);
+CREATE INDEX IF NOT EXISTS contacts_shard ON contacts(shard);
+CREATE TABLE IF NOT EXISTS groups (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT,
+    time TEXT,
+    location TEXT
+);
+CREATE TABLE IF NOT EXISTS group_members (
+    group_id TEXT NOT NULL,
+    contact_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (group_id, contact_id)
+);
+CREATE INDEX IF NOT EXISTS group_members_contact ON group_members(contact_id);
+CREATE TABLE IF NOT EXISTS event_participants (
+    event_id TEXT NOT NULL,
+    contact_id TEXT NOT NULL,
+    pending INTEGER NOT NULL DEFAULT 0,
+    note TEXT,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (event_id, contact_id)
+);
+CREATE INDEX IF NOT EXISTS event_participants_contact ON event_participants(contact_id);
+"""
+
+# אינדקס חיפוש מלא (FTS5 עם trigram - חיפוש תת-מחרוזת), מסונכרן בטריגרים
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+    search_name, search_phone, search_email,
+    content='contacts', content_rowid='rowid', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS contacts_fts_insert AFTER INSERT ON contacts BEGIN
+    INSERT INTO contacts_fts(rowid, search_name, search_phone, search_email)
+    VALUES (new.rowid, new.search_name, new.search_phone, new.search_email);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_fts_delete AFTER DELETE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, search_name, search_phone, search_email)
+    VALUES ('delete', old.rowid, old.search_name, old.search_phone, old.search_email);
+END;
+CREATE TRIGGER IF NOT EXISTS contacts_fts_update AFTER UPDATE ON contacts BEGIN
+    INSERT INTO contacts_fts(contacts_fts, rowid, search_name, search_phone, search_email)
+    VALUES ('delete', old.rowid, old.search_name, old.search_phone, old.search_email);
+    INSERT INTO contacts_fts(rowid, search_name, search_phone, search_email)
+    VALUES (new.rowid, new.search_name, new.search_phone, new.search_email);
+END;
+"""
+
+# trigram לא מחפש מחרוזות קצרות משלושה תווים
+FTS_MIN_LENGTH = 3
+
+
+def _next_position(table, where="", params=()):
+    return (f"(SELECT COALESCE(MAX(position), 0) + 1 FROM {table} {where})", params)
+
+
+def _fts_phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SQLiteStore:
+    """
+    אחסון נתוני הארגון בקובץ SQLite מקומי: טבלה לכל סוג ישות ולכל קשר
+    (חברי קבוצה, משתתפי אירוע), אינדקסים על טלפון, שם מנורמל וטבלאות הקשרים,
+    ו-FTS לחיפוש. כל שינוי הוא טרנזקציה קטנה על השורות שלו - לא כתיבה של הכל.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # החיבור משותף לממשק, לתהליכון הייבוא ולתהליכון הסנכרון - מוגן בנעילה
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        try:
+            self.connection.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # גרסת SQLite בלי FTS5 או בלי trigram - החיפוש יתבצע ב-LIKE
+            print(f"חיפוש FTS לא זמין: {str(e)}")
+            self.fts = False
+        self.connection.commit()
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def is_empty(self):
+        """האם עוד לא יובאו לכאן נתונים (הרצה ראשונה)"""
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = 'imported'").fetchone()
+        return row is None
+
+    # ---- קריאה ----
+
+    def _contacts(self, db, where="", params=()):
+        return [
+            {"id": row[0], "name": row[1], "phone": row[2], "email": row[3], "group": row[4]}
+            for row in db.execute(
+                f"SELECT id, name, phone, email, grp FROM contacts {where} ORDER BY position", params
+            )
+        ]
+
+    def _groups(self, db):
+        members = {}
+        for group_id, contact_id in db.execute(
+                "SELECT group_id, contact_id FROM group_members ORDER BY position"):
+            members.setdefault(group_id, []).append(contact_id)
+        return [
+            {"id": row[0], "name": row[1], "description": row[2], "members": members.get(row[0], [])}
+            for row in db.execute("SELECT id, name, description FROM groups ORDER BY position")
+        ]
+
+    def _events(self, db):
+        participants = {}
+        for event_id, contact_id, pending, note in db.execute(
+                "SELECT event_id, contact_id, pending, note FROM event_participants ORDER BY position"):
+            entry = participants.setdefault(
+                event_id, {"participants": [], "pending_participants": [], "pending_notes": {}}
+            )
+            if pending:
+                entry["pending_participants"].append(contact_id)
+                if note:
+                    entry["pending_notes"][contact_id] = note
+            else:
+                entry["participants"].append(contact_id)
+        return [
+            dict(
+                {"id": row[0], "title": row[1], "date": row[2], "time": row[3], "location": row[4]},
+                **participants.get(row[0], {"participants": [], "pending_participants": [], "pending_notes": {}})
+            )
+            for row in db.execute("SELECT id, title, date, time, location FROM events ORDER BY position")
+        ]
+
+    def load(self):
+        """מחזיר את כל הנתונים באותו מבנה של data.json (גרסה 2)"""
+        with self._lock:
+            db = self.connection
+            return {
+                "schema_version": 2,
+                "contacts": self._contacts(db),
+                "events": self._events(db),
+                "groups": self._groups(db)
+            }
+
+    def export_shards(self, paths):
+        """
+        התוכן של קבצים מפוצלים מסוימים (כמו ב-split_data), ישירות מהמסד -
+        בלי לבנות את כל הנתונים כדי לכתוב את מה שהשתנה
+        """
+        shards = {}
+        with self._lock:
+            db = self.connection
+            for path in paths:
+                if path == ORDER_FILE:
+                    shards[path] = serialize([row[0] for row in db.execute("SELECT id FROM contacts ORDER BY position")])
+                elif path == EVENTS_FILE:
+                    shards[path] = serialize(self._events(db))
+                elif path == GROUPS_FILE:
+                    shards[path] = serialize(self._groups(db))
+                else:
+                    shards[path] = serialize(self._contacts(db, "WHERE shard = ?", (path,)))
+        return shards
+
+    def search(self, query):
+        """מזהי אנשי הקשר שהשם, הטלפון או האימייל שלהם מכילים את השאילתה, לפי הסדר"""
+        text = normalize_search_text(query)
+        digits = phone_digits(query) if PHONE_QUERY_PATTERN.match(query) else ""
+
+        clauses, params = [], []
+        if self.fts and len(text) >= FTS_MIN_LENGTH:
+            clauses.append(
+                "rowid IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)"
+            )
+            params.append("{search_name search_email} : " + _fts_phrase(text))
+        else:
+            clauses.append("(search_name LIKE ? ESCAPE '\\' OR search_email LIKE ? ESCAPE '\\')")
+            params += [_like_pattern(text)] * 2
+        if digits:
+            if self.fts and len(digits) >= FTS_MIN_LENGTH:
+                clauses.append(
+                    "rowid IN (SELECT rowid FROM contacts_fts WHERE contacts_fts MATCH ?)"
+                )
+                params.append("search_phone : " + _fts_phrase(digits))
+            else:
+                clauses.append("search_phone LIKE ? ESCAPE '\\'")
+                params.append(_like_pattern(digits))
+
+        sql = f"SELECT id FROM contacts WHERE {' OR '.join(clauses)} ORDER BY position"
+        with self._lock:
+            return [row[0] for row in self.connection.execute(sql, params)]
+
+    def find_by_phone(self, phone):
+        """מזהה איש הקשר הראשון עם אותו טלפון מנורמל, או None"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT id FROM contacts WHERE phone_norm = ? ORDER BY position LIMIT 1",
+                (normalize_phone(phone),)
+            ).fetchone()
+        return row[0] if row else None
+
+    # ---- כתיבה ----
+
+    def _put_contact(self, db, contact, position=None):
+        values = (
+            contact["id"], contact["name"], contact["phone"],
+            contact.get("email") or "", contact.get("group") or "",
+            normalize_phone(contact["phone"]),
+            normalize_search_text(contact["name"]),
+            phone_digits(contact["phone"]),
+            normalize_search_text(contact.get("email")),
+            contact_shard_path(contact["id"])
+        )
+        if position is None:
+            position_sql, position_params = _next_position("contacts")
+        else:
+            position_sql, position_params = "?", (position,)
+        db.execute(
+            f"""INSERT INTO contacts (id, name, phone, email, grp, phone_norm,
+                                      search_name, search_phone, search_email, shard, position)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, {position_sql})
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name, phone = excluded.phone, email = excluded.email,
+                    grp = excluded.grp, phone_norm = excluded.phone_norm,
+                    search_name = excluded.search_name, search_phone = excluded.search_phone,
+                    search_email = excluded.search_email""",
+            values + position_params
+        )
+
+    def _put_group(self, db, group, position=None):
+        position_sql, position_params = (
+            _next_position("groups") if position is None else ("?", (position,))
+        )
+        db.execute(
+            f"""INSERT INTO groups (id, name, description, position)
+                VALUES (?, ?, ?, {position_sql})
+                ON CONFLICT(id) DO UPDATE SET
+                    name = excluded.name, description = excluded.description""",
+            (group["id"], group["name"], group.get("description") or "") + position_params
+        )
+
+    def _put_event(self, db, event, position=None):
+        position_sql, position_params = (
+            _next_position("events") if position is None else ("?", (position,))
+        )
+        db.execute(
+            f"""INSERT INTO events (id, title, date, time, location, position)
+                VALUES (?, ?, ?, ?, ?, {position_sql})
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title, date = excluded.date,
+                    time = excluded.time, location = excluded.location""",
+            (event["id"], event["title"], event.get("date"), event.get("time"), event.get("location"))
+            + position_params
+        )
+
+    def _add_member(self, db, group_id, contact_id):
+        position_sql, position_params = _next_position("group_members", "WHERE group_id = ?", (group_id,))
+        db.execute(
+            f"INSERT OR IGNORE INTO group_members (group_id, contact_id, position) VALUES (?, ?, {position_sql})",
+            (group_id, contact_id) + position_params
+        )
+
+    def _set_participant(self, db, event_id, contact_id, pending, note=None):
+        position_sql, position_params = _next_position("event_participants", "WHERE event_id = ?", (event_id,))
+        db.execute(
+            f"""INSERT INTO event_participants (event_id, contact_id, pending, note, position)
+                VALUES (?, ?, ?, ?, {position_sql})
+                ON CONFLICT(event_id, contact_id) DO UPDATE SET
+                    pending = excluded.pending, note = excluded.note""",
+            (event_id, contact_id, 1 if pending else 0, note) + position_params
+        )
+
+    def _apply_record(self, db, record):
+        """מחיל רשומה אחת ומחזיר את הקבצים המפוצלים שהיא משנה"""
+        op = record.get("op")
+        if op == "contact_put":
+            contact_id = record["contact"]["id"]
+            exists = db.execute("SELECT 1 FROM contacts WHERE id = ?", (contact_id,)).fetchone()
+            self._put_contact(db, record["contact"])
+            # איש קשר חדש נכנס גם לקובץ הסדר
+            return {contact_shard_path(contact_id)} if exists else {contact_shard_path(contact_id), ORDER_FILE}
+        elif op == "contact_del":
+            db.execute("DELETE FROM contacts WHERE id = ?", (record["id"],))
+            db.execute("DELETE FROM group_members WHERE contact_id = ?", (record["id"],))
+            db.execute("DELETE FROM event_participants WHERE contact_id = ?", (record["id"],))
+            return {contact_shard_path(record["id"]), ORDER_FILE, GROUPS_FILE, EVENTS_FILE}
+        elif op == "group_put":
+            self._put_group(db, record["group"])
+            return {GROUPS_FILE}
+        elif op == "group_del":
+            db.execute("DELETE FROM groups WHERE id = ?", (record["id"],))
+            db.execute("DELETE FROM group_members WHERE group_id = ?", (record["id"],))
+            return {GROUPS_FILE}
+        elif op == "member_add":
+            self._add_member(db, record["group"], record["contact"])
+            return {GROUPS_FILE}
+        elif op == "member_del":
+            db.execute(
+                "DELETE FROM group_members WHERE group_id = ? AND contact_id = ?",
+                (record["group"], record["contact"])
+            )
+            return {GROUPS_FILE}
+        elif op == "event_put":
+            self._put_event(db, record["event"])
+            return {EVENTS_FILE}
+        elif op == "event_del":
+            db.execute("DELETE FROM events WHERE id = ?", (record["id"],))
+            db.execute("DELETE FROM event_participants WHERE event_id = ?", (record["id"],))
+            return {EVENTS_FILE}
+        elif op == "participant_set":
+            self._set_participant(
+                db, record["event"], record["contact"], record.get("pending"), record.get("note")
+            )
+            return {EVENTS_FILE}
+        elif op == "participant_del":
+            db.execute(
+                "DELETE FROM event_participants WHERE event_id = ? AND contact_id = ?",
+                (record["event"], record["contact"])
+            )
+            return {EVENTS_FILE}
+        return set()
+
+    def apply(self, records):
+        """
+        מחיל רשומות שינוי (אותן רשומות של יומן השינויים) בטרנזקציה אחת.
+        מחזיר את הקבצים המפוצלים שהשתנו
+        """
+        changed = set()
+        with self._lock, self.connection as db:
+            for record in records:
+                changed |= self._apply_record(db, record)
+        return changed
+
+    def save_snapshot(self, data):
+        """מחליף את כל התוכן בנתונים שהועברו (ייבוא ראשון או נתונים מגיטהאב)"""
+        with self._lock, self.connection as db:
+            for table in ("contacts", "groups", "events", "group_members", "event_participants"):
+                db.execute(f"DELETE FROM {table}")
+
+            for position, contact in enumerate(data.get("contacts", [])):
+                self._put_contact(db, contact, position)
+            for position, group in enumerate(data.get("groups", [])):
+                self._put_group(db, group, position)
+                db.executemany(
+                    "INSERT OR IGNORE INTO group_members (group_id, contact_id, position) VALUES (?, ?, ?)",
+                    [(group["id"], contact_id, index) for index, contact_id in enumerate(group.get("members", []))]
+                )
+            for position, event in enumerate(data.get("events", [])):
+                self._put_event(db, event, position)
+                notes = event.get("pending_notes", {})
+                rows = [(event["id"], contact_id, 0, None) for contact_id in event.get("participants", [])]
+                rows += [
+                    (event["id"], contact_id, 1, notes.get(contact_id))
+                    for contact_id in event.get("pending_participants", [])
+                ]
+                db.executemany(
+                    """INSERT OR IGNORE INTO event_participants (event_id, contact_id, pending, note, position)
+                       VALUES (?, ?, ?, ?, ?)""",
+                    [row + (index,) for index, row in enumerate(rows)]
+                )
+
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported', '1')")
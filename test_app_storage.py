@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+import app
+from journal import JOURNAL_FILE
+from sharded_storage import ShardedStorage, contact_shard_path, split_data, MANIFEST_FILE, LEGACY_FILE
+from sqlite_store import SQLITE_FILE
+
+LEGACY_DATA = {
+    "contacts": [
+        {"name": "דנה", "phone": "0501111111", "email": "", "group": "משפחה"},
+        {"name": "יוסי", "phone": "0502222222", "email": "", "group": None},
+    ],
+    "events": [
+        {"title": "ישיבה", "date": "2024-01-01", "time": "10:00", "location": "",
+         "participants": ["דנה"], "pending_participants": ["יוסי"]},
+    ],
+    "groups": [
+        {"name": "משפחה", "description": "", "members": ["דנה"]},
+    ],
+}
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body
+        self.headers = {}
+
+    def json(self):
+        return self._body
+
+
+class FakeGitHub:
+    """גיטהאב ריק: אין נתונים מרוחקים, וכל שמירה מצליחה"""
+
+    def get(self, url, headers=None):
+        return FakeResponse(404)
+
+    def put(self, url, json=None):
+        return FakeResponse(201, {"content": {"sha": "sha"}})
+
+    def delete(self, url, json=None):
+        return FakeResponse(200, {})
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    managers = []
+
+    def make(storage_backend=None):
+        manager = app.AppManager(save_quiet_period=0.01, storage_backend=storage_backend)
+        login_manager = app.LoginManager()
+        login_manager.http = FakeGitHub()
+        login_manager.data_folder = str(tmp_path)
+        login_manager.current_user = "org"
+        manager.login_manager = login_manager
+        # בלי ממשק - רק הנתונים
+        manager.update_views = lambda *views: None
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.shutdown()
+
+
+@pytest.fixture
+def org_folder(tmp_path):
+    folder = tmp_path / "org"
+    folder.mkdir()
+    return folder
+
+
+def write_legacy(org_folder):
+    (org_folder / LEGACY_FILE).write_text(json.dumps(LEGACY_DATA, ensure_ascii=False), encoding="utf-8")
+
+
+def test_migrates_v1_data_json(make_app, org_folder):
+    write_legacy(org_folder)
+
+    manager = make_app()
+    assert manager.load_data()
+
+    # ההמרה נשמרת מיד לקבצים המפוצלים, והקובץ הישן נמחק
+    assert (org_folder / MANIFEST_FILE).exists()
+    assert not (org_folder / LEGACY_FILE).exists()
+
+    dana, yossi = manager.contacts
+    assert dana.id and yossi.id and dana.id != yossi.id
+    assert list(manager.groups[0].members) == [dana]
+    assert list(manager.events[0].participants) == [dana]
+    assert list(manager.events[0].pending_participants) == [yossi]
+
+    saved = ShardedStorage(str(org_folder)).load()
+    assert saved["schema_version"] == app.SCHEMA_VERSION
+    assert [c["id"] for c in saved["contacts"]] == [dana.id, yossi.id]
+    assert saved["groups"][0]["members"] == [dana.id]
+
+    # טעינה חוזרת שומרת על אותם מזהים
+    reloaded = make_app()
+    reloaded.load_data()
+    assert [c.id for c in reloaded.contacts] == [dana.id, yossi.id]
+
+
+def test_replays_journal_after_crash(make_app, org_folder):
+    write_legacy(org_folder)
+    manager = make_app()
+    manager.load_data()
+
+    dana = manager.contacts[0]
+    dana.name = "דנה כהן"
+    manager.record_change("contact_put", contact=manager.contact_record(dana))
+    manager.save_data()
+    # השינוי רק ביומן - הקבצים עוד לא קופלו
+    assert (org_folder / JOURNAL_FILE).exists()
+    assert ShardedStorage(str(org_folder)).load()["contacts"][0]["name"] == "דנה"
+
+    # "קריסה": מנהל חדש טוען מאותה תיקייה
+    recovered = make_app()
+    recovered.load_data()
+    assert recovered.contacts[0].name == "דנה כהן"
+    # השינוי ששוחזר לא נדרס ברענון מגיטהאב
+    assert recovered.apply_remote_data({"schema_version": app.SCHEMA_VERSION, "contacts": []}) is False
+
+    # ביציאה היומן מקופל לקבצים
+    recovered.save_now()
+    assert not (org_folder / JOURNAL_FILE).exists()
+    assert ShardedStorage(str(org_folder)).load()["contacts"][0]["name"] == "דנה כהן"
+
+
+def test_save_writes_only_dirty_shards(make_app, org_folder):
+    write_legacy(org_folder)
+    manager = make_app()
+    manager.load_data()
+    pushed = []
+    manager.login_manager._queue_push = lambda changed: pushed.append(set(changed))
+
+    dana = manager.contacts[0]
+    dana.email = "dana@example.com"
+    manager.record_change("contact_put", contact=manager.contact_record(dana))
+    manager.save_now()
+
+    assert pushed == [{contact_shard_path(dana.id), MANIFEST_FILE}]
+    # הקבצים על הדיסק זהים לפיצול מלא של הנתונים
+    storage = manager.login_manager.storage
+    assert all(storage.read(path) == text for path, text in split_data(manager.snapshot()).items())
+
+
+def test_sqlite_first_import_replays_journal(make_app, org_folder):
+    write_legacy(org_folder)
+    manager = make_app()
+    manager.load_data()
+    dana = manager.contacts[0]
+    dana.name = "דנה כהן"
+    manager.record_change("contact_put", contact=manager.contact_record(dana))
+
+    # הארגון עובר ל-SQLite כשהשינוי עוד רק ביומן
+    migrated = make_app(app.STORAGE_SQLITE)
+    migrated.load_data()
+
+    assert (org_folder / SQLITE_FILE).exists()
+    assert not (org_folder / JOURNAL_FILE).exists()
+    assert [c.name for c in migrated.contacts] == ["דנה כהן", "יוסי"]
+    assert [c["name"] for c in migrated.backend.load()["contacts"]] == ["דנה כהן", "יוסי"]
+
+    # הקבצים המפוצלים מתעדכנים מהמסד
+    migrated.save_queue.flush()
+    saved = migrated.login_manager.storage.load()
+    assert [c["name"] for c in saved["contacts"]] == ["דנה כהן", "יוסי"]
+
+    # הטעינה הבאה מהמסד בלבד
+    migrated.shutdown()
+    reopened = make_app(app.STORAGE_SQLITE)
+    reopened.load_data()
+    assert [c.name for c in reopened.contacts] == ["דנה כהן", "יוסי"]
@@ -0,0 +1,65 @@
+from journal import ChangeJournal, replay
+
+
+def contact(contact_id, name):
+    return {"id": contact_id, "name": name, "phone": "050", "email": "", "group": None}
+
+
+def test_replay_after_crash_drops_torn_line(tmp_path):
+    journal = ChangeJournal(str(tmp_path))
+    journal.append("contact_put", contact=contact("a", "ראשון"))
+    journal.append("contact_put", contact=contact("b", "שני"))
+    # קריסה באמצע כתיבת הרשומה הבאה
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op": "contact_del", "id": "a"')
+
+    records = ChangeJournal(str(tmp_path)).records()
+    data = replay({"schema_version": 2}, records)
+
+    assert [c["name"] for c in data["contacts"]] == ["ראשון", "שני"]
+
+    # הרישום הבא מתחיל בשורה נקייה
+    journal.append("contact_del", id="a")
+    data = replay({"schema_version": 2}, journal.records())
+    assert [c["id"] for c in data["contacts"]] == ["b"]
+
+
+def test_crash_during_save_keeps_rotated_records(tmp_path):
+    journal = ChangeJournal(str(tmp_path))
+    journal.append("contact_put", contact=contact("a", "לפני"))
+    # השמירה הקפיאה את היומן ונקטעה לפני discard_rotated
+    journal.rotate()
+    journal.append("contact_put", contact=contact("a", "אחרי"))
+
+    data = replay({"schema_version": 2}, ChangeJournal(str(tmp_path)).records())
+
+    assert [c["name"] for c in data["contacts"]] == ["אחרי"]
+
+
+def test_replay_is_idempotent():
+    records = [
+        {"op": "contact_put", "contact": contact("a", "א")},
+        {"op": "group_put", "group": {"id": "g", "name": "קבוצה", "description": ""}},
+        {"op": "member_add", "group": "g", "contact": "a"},
+        {"op": "event_put", "event": {"id": "e", "title": "t", "date": "d", "time": "x", "location": ""}},
+        {"op": "participant_set", "event": "e", "contact": "a", "pending": False},
+    ]
+
+    once = replay({"schema_version": 2}, list(records))
+    twice = replay({"schema_version": 2}, records + records)
+
+    assert once == twice
+    assert once["groups"][0]["members"] == ["a"]
+    assert once["events"][0]["participants"] == ["a"]
+
+
+def test_contact_delete_removes_references():
+    data = replay({"schema_version": 2}, [
+        {"op": "contact_put", "contact": contact("a", "א")},
+        {"op": "group_put", "group": {"id": "g", "name": "קבוצה", "description": ""}},
+        {"op": "member_add", "group": "g", "contact": "a"},
+        {"op": "contact_del", "id": "a"},
+    ])
+
+    assert data["contacts"] == []
+    assert data["groups"][0]["members"] == []
@@ -0,0 +1,86 @@
+import threading
+
+from render_batch import PageUpdater, batched_render
+
+
+class FakePage:
+    def __init__(self):
+        self.updates = []
+
+    def update(self, *controls):
+        self.updates.append(controls)
+
+
+class FakeControl:
+    def __init__(self, page):
+        self.page = page
+
+
+def test_batch_sends_one_update():
+    page = FakePage()
+    updater = PageUpdater(page)
+
+    with updater.batch():
+        updater.request_update()
+        with updater.batch():
+            updater.request_update()
+        updater.request_update()
+        assert page.updates == []
+
+    assert page.updates == [()]
+    assert updater.update_count == 1
+
+
+def test_update_outside_batch_is_sent_immediately():
+    page = FakePage()
+    updater = PageUpdater(page)
+
+    updater.request_update()
+    updater.request_update()
+
+    assert len(page.updates) == 2
+    assert updater.update_count == 2
+
+
+def test_controls_are_sent_together_once():
+    page = FakePage()
+    updater = PageUpdater(page)
+    first, second = FakeControl(page), FakeControl(page)
+    # רכיב שעוד לא נוסף לדף לא נשלח
+    detached = FakeControl(None)
+
+    with updater.batch():
+        updater.request_update(first)
+        updater.request_update(second, first, detached)
+
+    assert page.updates == [(first, second)]
+    assert updater.update_count == 1
+
+
+def test_nothing_requested_sends_nothing():
+    page = FakePage()
+    updater = PageUpdater(page)
+
+    with updater.batch():
+        pass
+
+    assert page.updates == []
+    assert updater.update_count == 0
+
+
+def test_batched_render_wraps_handler():
+    class Handler:
+        def __init__(self):
+            self.page_updater = PageUpdater(FakePage())
+            self.data_lock = threading.RLock()
+
+        @batched_render
+        def act(self):
+            self.page_updater.request_update()
+            self.page_updater.request_update()
+            return self.page_updater.update_count
+
+    handler = Handler()
+
+    assert handler.act() == 0
+    assert handler.page_updater.update_count == 1